@@ -0,0 +1,140 @@
+"""
+Summary of the datasets by cell of the parameters of interest, shared by the figure scripts.
+A summary has one row per cell with the number of simulations, the means of some columns and the modal state of the
+community, computed in one vectorized pass (cells and states being integer-encoded and counted with bincount).
+Summaries are cached next to their dataset and computed again only when the dataset changes, as are the rasters
+interpolated from them for the phase maps.
+"""
+
+### libraries
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.interpolate import CloughTocher2DInterpolator
+from scipy.spatial import Delaunay
+
+from Dataset_IO import find_dataset, load_dataset
+
+# states of the community at the equilibrium (persistence of sp1 and sp2), indexed by eq_sp1 + 2 * eq_sp2
+STATES = ('00', '10', '01', '11')
+
+
+def summarize(df, by, means=(), modal=False, decimals=10):
+    """
+    :param df: dataset
+    :param by: columns defining the cells (e.g. ['a', 'B'])
+    :param means: columns averaged in each cell, NaN being ignored, written as 'av_' + column
+    :param modal: if True, add the modal state of the community 'mode' (see STATES, ties going to the first state),
+    its frequency 'freq' and the frequency of each state 'freq_' + state
+    :param decimals: number of decimals to which the cells are rounded (so that e.g. l2 - l1 gives exact cells)
+    :return: dataframe with one row per cell, sorted by cell, with the number of simulations 'count'
+    """
+    keys = np.round(df[list(by)].to_numpy(dtype='float64'), decimals)
+    cells, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    count = np.bincount(inverse, minlength=len(cells))
+
+    summary = pd.DataFrame(cells, columns=list(by))
+    summary['count'] = count
+
+    for column in means:
+        values = df[column].to_numpy(dtype='float64')
+        valid = ~np.isnan(values)
+        total = np.bincount(inverse[valid], weights=values[valid], minlength=len(cells))
+        number = np.bincount(inverse[valid], minlength=len(cells))
+        summary['av_' + column] = np.divide(total, number, out=np.full(len(cells), np.nan), where=number > 0)
+
+    if modal:
+        state = df['eq_sp1'].to_numpy(dtype='int64') + 2 * df['eq_sp2'].to_numpy(dtype='int64')
+        states = np.bincount(inverse * len(STATES) + state, minlength=len(cells) * len(STATES)).reshape(-1, len(STATES))
+        summary['mode'] = np.array(STATES)[states.argmax(axis=1)]
+        summary['freq'] = states.max(axis=1) / count
+        for i, name in enumerate(STATES):
+            summary['freq_' + name] = states[:, i] / count
+
+    return summary
+
+
+def load_summary(name, by, means=(), modal=False, derived=None, query=None, folder='./data'):
+    """
+    Summary of a dataset (see summarize), cached in '{name}.summary-{hash of the arguments}.npz' next to the dataset
+    :param name: name of the dataset without extension (e.g. 'df_two_mimicry')
+    :param by: columns defining the cells
+    :param means: columns averaged in each cell
+    :param modal: if True, add the modal state of the community
+    :param derived: dictionary {column: expression} of columns computed with DataFrame.eval before the summary (e.g.
+    {'sr': 'M / (M + F)'})
+    :param query: expression selecting the simulations summarized, given to DataFrame.query (e.g. 'eq_sp1 == 1')
+    :param folder: folder of the datasets
+    :return: summary dataframe
+    """
+    path = find_dataset(name, folder)
+    settings = json.dumps({'by': list(by), 'means': list(means), 'modal': modal, 'derived': derived or {},
+                           'query': query}, sort_keys=True)
+    cache = os.path.join(os.path.dirname(path), '{0}.summary-{1}.npz'.format(
+        name, hashlib.sha256(settings.encode()).hexdigest()[:12]))
+    stat = os.stat(path)
+    signature = '{0}:{1}:{2}'.format(os.path.basename(path), stat.st_size, stat.st_mtime_ns)
+
+    if os.path.exists(cache):
+        with np.load(cache) as data:
+            if str(data['__signature__']) == signature:
+                return pd.DataFrame({column: data[column] for column in data.files if not column.startswith('__')})
+
+    # only the columns used are read, unless expressions may refer to any column
+    columns = None
+    if not derived and not query:
+        columns = list(dict.fromkeys(list(by) + list(means) + (['eq_sp1', 'eq_sp2'] if modal else [])))
+    df = load_dataset(path, columns=columns)
+    for column, expression in (derived or {}).items():
+        df[column] = df.eval(expression)
+    if query:
+        df = df.query(query)
+
+    summary = summarize(df, by, means, modal)
+    np.savez_compressed(cache, __signature__=np.array(signature),
+                        **{column: summary[column].to_numpy(dtype=str if column == 'mode' else None)
+                           for column in summary.columns})
+    return summary
+
+
+def interpolate(df, x, y, channels, extent, shape=(100, 100), cache=None, triangulations=None):
+    """
+    Cubic interpolation (as griddata with method='cubic') of several columns of a summary on a regular grid, the
+    Delaunay triangulation of the cells being built once for all the columns
+    :param df: summary dataframe
+    :param x: column of the x coordinates
+    :param y: column of the y coordinates
+    :param channels: columns to interpolate
+    :param extent: [xmin, xmax, ymin, ymax] of the grid
+    :param shape: numbers of points of the grid along y and x
+    :param cache: path of the dataset without extension (e.g. './data/df_two_mimicry'), the rasters being cached in
+    '{cache}.raster-{hash of the data and of the grid}.npz'; None to always interpolate
+    :param triangulations: dictionary of the Delaunay triangulations already built, keyed by the bytes of the cells and
+    filled by the call, to share them between summaries with the same cells
+    :return: xi, yi coordinates of the grid (as given by np.meshgrid) and array of the rasters, one per channel
+    """
+    xi, yi = np.meshgrid(np.linspace(extent[0], extent[1], shape[1]), np.linspace(extent[2], extent[3], shape[0]))
+    points = df[[x, y]].to_numpy(dtype='float64')
+    values = df[list(channels)].to_numpy(dtype='float64')
+
+    if cache is not None:
+        key = hashlib.sha256(points.tobytes() + values.tobytes() + json.dumps(
+            [list(channels), list(extent), list(shape)]).encode()).hexdigest()[:12]
+        path = '{0}.raster-{1}.npz'.format(cache, key)
+        if os.path.exists(path):
+            with np.load(path) as data:
+                return xi, yi, data['rasters']
+
+    triangulations = {} if triangulations is None else triangulations
+    key = points.tobytes()
+    if key not in triangulations:
+        triangulations[key] = Delaunay(points)
+    rasters = np.moveaxis(CloughTocher2DInterpolator(triangulations[key], values)(xi, yi), -1, 0)
+
+    if cache is not None:
+        np.savez_compressed(path, rasters=rasters)
+    return xi, yi, rasters
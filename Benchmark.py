@@ -0,0 +1,220 @@
+"""
+Benchmarks of the differential equations systems and of their Jacobian matrices, of the engines of solver and of the
+generation of datasets.
+Timings are written to a JSON file with a description of the machine, and compared to a baseline file (e.g. the
+output of a previous run) to flag regressions:
+    python Benchmark.py --output benchmark.json --baseline baseline.json
+"""
+
+### libraries
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import timeit
+
+import numpy as np
+import scipy
+from scipy.integrate import odeint
+
+import Functions_Library
+from Functions_Library import no_mimicry, mimicry, dslm, KERNELS, JACOBIANS, JACOBIAN_KERNELS, parameter_vector, \
+    PARAMETER_NAMES
+from Dataframe_Generator import ENGINES, dataframe_generator
+
+# representative parameter regimes (AB,SR,ab,sr,b,d,p,l1,k1,l2,k2,cw,cb,K,a,B)
+REGIMES = {
+    # two mimetic species coexisting, reached in a few restarts
+    'easy': (mimicry, (500, 0.5, 500, 0.5, 1, 0.2, 0.3, 0.05, 3, 0.04, 3, 1, 0.3, 1000, 5, 0.8)),
+    # one species close to the fold of its persistence boundary: slow convergence
+    'slow': (no_mimicry, (500, 0.5, 0, 0, 0.85, 0.2, 0.6, 0.02, 3, 0, 1, 1, 0, 1000, 5, 0.505)),
+    # large abundances and fast rates: stiff system
+    'stiff': (mimicry, (1e5, 0.5, 1e5, 0.5, 5, 0.1, 5, 0.5, 10, 0.5, 10, 1, 0.3, 1e6, 1.5, 0.9)),
+    # one species going extinct in the first window
+    'extinct': (no_mimicry, (512, 0.77, 0, 0, 0.74, 0.29, 0.6, 0.02, 0.42, 0, 1, 1, 0, 1000, 0, 0.5)),
+}
+
+
+def machine_metadata():
+    """
+    :return: dictionary describing the machine, the libraries and the commit on which the benchmarks are run
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'commit': commit,
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__,
+            'numba': Functions_Library.NUMBA}
+
+
+def time_call(function, repeat=5):
+    """
+    :param function: function without argument to time
+    :param repeat: number of measures, each calling the function for at least 0.2 seconds
+    :return: best time of a call (seconds), less sensitive to the load of the machine than the mean
+    """
+    timer = timeit.Timer(function)
+    number = timer.autorange()[0]
+    return min(timer.repeat(repeat, number)) / number
+
+
+def bench_rhs(repeat=5):
+    """
+    :return: {name: seconds} for one evaluation of each system, as a dictionary function and as a compiled kernel
+    """
+    param_dict = dict(zip(PARAMETER_NAMES[4:], REGIMES['easy'][1][4:]))
+    theta = parameter_vector(param_dict)
+    n = np.array([300, 400, 200, 300], dtype='float64')
+
+    results = {}
+    for func in (no_mimicry, mimicry, dslm):
+        kernel = KERNELS[func]
+        kernel(n, 0, theta)  # compilation
+        results['rhs/{0}'.format(func.__name__)] = time_call(lambda: func(n, 0, param_dict), repeat)
+        results['rhs/{0}_kernel'.format(func.__name__)] = time_call(lambda: kernel(n, 0, theta), repeat)
+    return results
+
+
+def bench_jacobian(repeat=5, regime='stiff'):
+    """
+    :return: {name: seconds} for one evaluation of the Jacobian matrix of each system, as a dictionary function and as
+    a compiled kernel, and for the integration of a regime of REGIMES by odeint with the compiled Jacobian matrix
+    ('analytic') and with its own finite differences ('numerical')
+    """
+    param_dict = dict(zip(PARAMETER_NAMES[4:], REGIMES['easy'][1][4:]))
+    theta = parameter_vector(param_dict)
+    n = np.array([300, 400, 200, 300], dtype='float64')
+
+    results = {}
+    for func in (no_mimicry, mimicry, dslm):
+        jac, kernel = JACOBIANS[func], JACOBIAN_KERNELS[func]
+        kernel(n, 0, theta)  # compilation
+        results['jacobian/{0}'.format(func.__name__)] = time_call(lambda: jac(n, 0, param_dict), repeat)
+        results['jacobian/{0}_kernel'.format(func.__name__)] = time_call(lambda: kernel(n, 0, theta), repeat)
+
+    func, params = REGIMES[regime]
+    AB, SR, ab, sr = params[:4]
+    state = np.array([AB * (1 - SR), AB * SR, ab * (1 - sr), ab * sr], dtype='float64')
+    theta = parameter_vector(dict(zip(PARAMETER_NAMES[4:], params[4:])))
+    time_int = np.array([0, 50], dtype='float64')
+    kernel, jac = KERNELS[func], JACOBIAN_KERNELS[func]
+    results['jacobian/{0}_analytic'.format(regime)] = time_call(
+        lambda: odeint(kernel, state, time_int, args=(theta,), Dfun=jac), repeat)
+    results['jacobian/{0}_numerical'.format(regime)] = time_call(
+        lambda: odeint(kernel, state, time_int, args=(theta,)), repeat)
+    return results
+
+
+def bench_solver(repeat=5, engines=('solver', 'steady', 'equilibrium')):
+    """
+    :return: {name: seconds} for one call of each engine in each regime of REGIMES
+    """
+    results = {}
+    for regime, (func, params) in REGIMES.items():
+        for name in engines:
+            engine = ENGINES[name]
+            engine(func, *params)  # compilation of the kernels
+            results['{0}/{1}'.format(name, regime)] = time_call(lambda: engine(func, *params), repeat)
+    return results
+
+
+def bench_generator(Ns=(1, 4), workers=1, engine='solver'):
+    """
+    :return: {name: seconds} for the generation of the (a, B) dataset of two mimetic species with N batches (121
+    simulations per batch), run once in a temporary folder
+    """
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        try:
+            for N in Ns:
+                start = time.perf_counter()
+                dataframe_generator(func=mimicry, N=N, label='benchmark', workers=workers, seed=0, engine=engine)
+                results['dataframe_generator/N={0}'.format(N)] = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    :param results: {name: seconds} of the current run
+    :param baseline: {name: seconds} of the baseline
+    :param tolerance: relative slow-down above which a benchmark is flagged
+    :return: list of (name, baseline seconds, current seconds, ratio) of the regressions
+    """
+    regressions = []
+    for name, seconds in results.items():
+        if name in baseline and seconds > baseline[name] * (1 + tolerance):
+            regressions.append((name, baseline[name], seconds, seconds / baseline[name]))
+    return regressions
+
+
+def run_benchmarks(output='benchmark.json', baseline=None, tolerance=0.2,
+                   suites=('rhs', 'jacobian', 'solver', 'generator'), repeat=5, Ns=(1, 4), workers=1):
+    """
+    :param output: path of the JSON file of the results
+    :param baseline: path of a JSON file of a previous run to compare to
+    :param tolerance: relative slow-down above which a benchmark is flagged
+    :param suites: benchmarks to run among 'rhs', 'jacobian', 'solver' and 'generator'
+    :param repeat: number of measures of the rhs, jacobian and solver benchmarks
+    :param Ns: numbers of batches of the generator benchmark
+    :param workers: number of processes of the generator benchmark
+    :return: list of the regressions (see compare)
+    """
+    results = {}
+    if 'rhs' in suites:
+        results.update(bench_rhs(repeat))
+    if 'jacobian' in suites:
+        results.update(bench_jacobian(repeat))
+    if 'solver' in suites:
+        results.update(bench_solver(repeat))
+    if 'generator' in suites:
+        results.update(bench_generator(Ns, workers))
+
+    reference = {}
+    if baseline is not None:
+        with open(baseline) as file:
+            reference = json.load(file)['results']
+    regressions = compare(results, reference, tolerance)
+
+    with open(output, 'w') as file:
+        json.dump({'metadata': machine_metadata(), 'results': results}, file, indent=1)
+
+    for name, seconds in results.items():
+        ratio = ' ({0:.2f}x baseline)'.format(seconds / reference[name]) if name in reference else ''
+        print('{0:<32} {1:>12.3e} s{2}'.format(name, seconds, ratio))
+    for name, before, after, ratio in regressions:
+        print('REGRESSION {0}: {1:.3e} s -> {2:.3e} s ({3:.2f}x)'.format(name, before, after, ratio))
+
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default='benchmark.json', help='JSON file of the results')
+    parser.add_argument('--baseline', help='JSON file of a previous run to compare to')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='relative slow-down flagged as a regression')
+    parser.add_argument('--suites', nargs='+', default=['rhs', 'jacobian', 'solver', 'generator'],
+                        choices=['rhs', 'jacobian', 'solver', 'generator'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--N', type=int, nargs='+', default=[1, 4], help='numbers of batches of dataframe_generator')
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    regressions = run_benchmarks(args.output, args.baseline, args.tolerance, args.suites, args.repeat, args.N,
+                                 args.workers)
+    raise SystemExit(1 if regressions else 0)
@@ -0,0 +1,255 @@
+"""
+Numerical continuation of the equilibria of the differential equations systems of Functions_Library.
+Starting from a known equilibrium, the branch of equilibria is followed by pseudo-arclength continuation while one
+parameter varies, and its fold points (saddle-node, where the branch turns back), transcritical points (where a species
+reaches 0, exchanging stability with the equilibrium without this species) and Hopf points are located.
+The persistence boundary is then traced in a second parameter by repeating the continuation from the previous
+boundary (warm start), which replaces the Monte Carlo estimation over a grid of both parameters.
+"""
+
+### libraries
+import numpy as np
+from scipy.optimize import root
+
+from Functions_Library import jacobian, steady_state, no_mimicry
+
+
+def _reduced(func, param_dict, parameter, mask):
+    """
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param param_dict: dictionary for all parameters
+    :param parameter: name of the continuation parameter
+    :param mask: state variables of the species present
+    :return: F(y) and its Jacobian matrix [dF/dx, dF/dparameter] for y = (state of the present species, parameter)
+    """
+    n = np.zeros(4)
+    params = dict(param_dict)
+
+    def F(y):
+        n[mask] = y[:-1]
+        params[parameter] = y[-1]
+        return func(n, 0, params)[mask]
+
+    def DF(y):
+        n[mask] = y[:-1]
+        h = 1e-6 * (abs(y[-1]) + 1)
+        params[parameter] = y[-1] + h
+        forward = func(n, 0, params)[mask]
+        params[parameter] = y[-1] - h
+        backward = func(n, 0, params)[mask]
+        params[parameter] = y[-1]
+        return np.column_stack([jacobian(func, n, params)[np.ix_(mask, mask)], (forward - backward) / (2 * h)])
+
+    return F, DF
+
+
+def _tangent(DF, y, previous):
+    """
+    :param DF: Jacobian matrix function of the reduced system
+    :param y: point of the branch
+    :param previous: tangent at the previous point, giving the direction of the continuation
+    :return: unit tangent to the branch at y
+    """
+    A = DF(y)
+    t = np.linalg.lstsq(np.vstack([A, previous]), np.append(np.zeros(len(A)), 1), rcond=None)[0]
+    return t / np.linalg.norm(t)
+
+
+def _correct(F, DF, y0, t0, ds, scale, tol=1e-9, max_iter=10):
+    """
+    Newton corrector of the pseudo-arclength continuation
+    :param F, DF: reduced system and its Jacobian matrix
+    :param y0, t0: last point of the branch and its tangent (in scaled variables)
+    :param ds: arclength step (in scaled variables)
+    :param scale: scale of each variable
+    :return: next point of the branch and the number of Newton iterations, or (None, max_iter) if Newton failed
+    """
+    z = y0 / scale + ds * t0
+    for iteration in range(1, max_iter + 1):
+        y = z * scale
+        residual = np.append(F(y) / scale[:-1], 0)
+        A = np.vstack([DF(y) * scale / scale[:-1, None], t0])
+        dz = np.linalg.solve(A, -residual)
+        z = z + dz
+        if not np.all(np.isfinite(z)):
+            break
+        if np.linalg.norm(dz) < tol * (1 + np.linalg.norm(z)):
+            return z * scale, iteration
+    return None, max_iter
+
+
+def _test_functions(DF, y, t, mask):
+    """
+    :param DF: Jacobian matrix function of the reduced system
+    :param y: point of the branch
+    :param t: tangent at y
+    :param mask: state variables of the species present
+    :return: dictionary of the test functions changing sign at each type of bifurcation point, and the eigenvalues of
+    the Jacobian matrix
+    """
+    eigenvalues = np.linalg.eigvals(DF(y)[:, :-1])
+    state = np.zeros(4)
+    state[mask] = y[:-1]
+    species = [state[0] + state[1], state[2] + state[3]]
+    present = [mask[0], mask[2]]
+    complex_unstable = np.sum((eigenvalues.real > 0) & (eigenvalues.imag != 0))
+
+    return {'fold': t[-1],
+            'transcritical': min(x for x, p in zip(species, present) if p),
+            'hopf': (-1) ** (complex_unstable // 2)}, eigenvalues
+
+
+def continuation(func, state, param_dict, parameter, end, ds=0.01, ds_min=1e-6, ds_max=0.05, max_steps=2000,
+                 stop=None):
+    """
+    Pseudo-arclength continuation of the branch of equilibria containing state, from param_dict[parameter] to end.
+    Variables are scaled by the initial abundances and by the parameter range, so that ds is a fraction of both.
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param state: equilibrium [F1,M1,F2,M2] for param_dict (e.g. given by solver or equilibrium_solver), species absent
+    from this equilibrium are kept absent
+    :param param_dict: dictionary for all parameters
+    :param parameter: name of the continuation parameter (e.g. 'a', 'B', 'l1')
+    :param end: value of the parameter at which the continuation stops
+    :param ds: initial arclength step
+    :param ds_min: minimal step, the continuation stops if the corrector fails with smaller steps
+    :param ds_max: maximal step
+    :param max_steps: maximal number of steps
+    :param stop: number of bifurcation points after which the continuation stops (None to go to end)
+    :return: dictionary with the 'parameter' values, 'states' (array of shape (steps, 4)) and stability ('stable') of
+    the points of the branch, and the bifurcation 'points' found: list of dictionaries with their 'type' ('fold',
+    'transcritical' or 'hopf'), 'parameter' value, 'state', and 'step' (index of the last point before them)
+    """
+    state = np.asarray(state, dtype='float64')
+    mask = np.repeat([state[0] + state[1] > 0, state[2] + state[3] > 0], 2)
+    if not mask.any():
+        raise ValueError("the continuation must start from an equilibrium with at least one species")
+
+    F, DF = _reduced(func, param_dict, parameter, mask)
+    start = param_dict[parameter]
+    scale = np.append(np.abs(state[mask]) + 1, abs(end - start) or 1)
+    direction = np.sign(end - start) or 1
+
+    y = np.append(state[mask], start)
+    t = _tangent(lambda y: DF(y) * scale, y, np.append(np.zeros(mask.sum()), direction))
+    tests, eigenvalues = _test_functions(DF, y, t, mask)
+
+    def full_state(y):
+        n = np.zeros(4)
+        n[mask] = y[:-1]
+        return n
+
+    branch = {'parameter': [y[-1]], 'states': [full_state(y)], 'stable': [bool(np.all(eigenvalues.real < 0))],
+              'points': []}
+
+    for step in range(max_steps):
+        y_next, iterations = _correct(F, DF, y, t, ds, scale)
+        if y_next is None:
+            ds /= 2
+            if ds < ds_min:
+                break
+            continue
+        t_next = _tangent(lambda y: DF(y) * scale, y_next, t)
+        tests_next, eigenvalues = _test_functions(DF, y_next, t_next, mask)
+
+        # bifurcation points between y and y_next are located by bisection on the arclength
+        for kind in tests:
+            if np.sign(tests[kind]) * np.sign(tests_next[kind]) < 0:
+                low, high, point = 0, ds, y_next
+                for _ in range(30):
+                    middle = (low + high) / 2
+                    y_middle = _correct(F, DF, y, t, middle, scale)[0]
+                    if y_middle is None:
+                        break
+                    point = y_middle
+                    t_middle = _tangent(lambda y: DF(y) * scale, y_middle, t)
+                    if np.sign(_test_functions(DF, y_middle, t_middle, mask)[0][kind]) == np.sign(tests[kind]):
+                        low = middle
+                    else:
+                        high = middle
+                branch['points'].append({'type': kind, 'parameter': point[-1], 'state': full_state(point),
+                                         'step': len(branch['parameter']) - 1})
+
+        y, t, tests = y_next, t_next, tests_next
+        branch['parameter'].append(y[-1])
+        branch['states'].append(full_state(y))
+        branch['stable'].append(bool(np.all(eigenvalues.real < 0)))
+
+        if stop is not None and len(branch['points']) >= stop:
+            break
+        if (y[-1] - end) * direction >= 0 or (y[-1] - start) * direction < 0:
+            break
+        ds = min(ds * 1.3, ds_max) if iterations <= 3 else ds
+
+    branch['parameter'] = np.array(branch['parameter'])
+    branch['states'] = np.array(branch['states'])
+    branch['stable'] = np.array(branch['stable'])
+    return branch
+
+
+def trace_boundary(func, state, param_dict, parameter, end, second, values, kinds=('fold', 'transcritical'),
+                   **options):
+    """
+    Persistence boundary in the (parameter, second) plane: for each value of the second parameter, the branch of
+    equilibria is continued in parameter up to its first fold or transcritical point, the continuation starting from
+    the last regular point before the boundary found for the previous value (warm start).
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param state: equilibrium [F1,M1,F2,M2] for param_dict with param_dict[second] = values[0]
+    :param param_dict: dictionary for all parameters
+    :param parameter: name of the continuation parameter
+    :param end: value of parameter at which the continuations stop
+    :param second: name of the second parameter
+    :param values: values of the second parameter, ordered along the boundary
+    :param kinds: types of bifurcation points considered as the boundary
+    :param options: options of continuation
+    :return: dictionary with the 'second' values, the 'parameter' values at the boundary (nan if the branch reaches end
+    without boundary) and the 'type' of the boundary points
+    """
+    params = dict(param_dict)
+    state = np.asarray(state, dtype='float64')
+    mask = np.repeat([state[0] + state[1] > 0, state[2] + state[3] > 0], 2)
+    boundary = {'second': np.asarray(values, dtype='float64'), 'parameter': np.full(len(values), np.nan),
+                'type': [None] * len(values)}
+
+    # warm starts: (parameter value, state) of points of the branch of the previous value of the second parameter
+    origin = [(params[parameter], state)]
+    warm = origin
+
+    for i, value in enumerate(values):
+        params[second] = value
+
+        # the warm start is corrected at the new value of the second parameter, moving back along the previous branch
+        # while the correction fails (the boundary may have moved before the warm start), down to the initial point
+        # which is integrated as a last resort
+        F, DF = _reduced(func, params, parameter, mask)
+        for params[parameter], state in warm:
+            sol = root(lambda x: F(np.append(x, params[parameter])), state[mask],
+                       jac=lambda x: DF(np.append(x, params[parameter]))[:, :-1], method='hybr')
+            if sol.success and np.all(sol.x > 0) and np.all(np.linalg.eigvals(
+                    DF(np.append(sol.x, params[parameter]))[:, :-1]).real < 0):
+                state = state.copy()
+                state[mask] = sol.x
+                break
+        else:
+            state = steady_state(func, state, params)[0]
+            if not np.all(state[mask] > 0.001):
+                break
+
+        branch = continuation(func, state, params, parameter, end, **options)
+        points = [point for point in branch['points'] if point['type'] in kinds]
+        if not points:
+            continue
+
+        boundary['parameter'][i] = points[0]['parameter']
+        boundary['type'][i] = points[0]['type']
+        warm = [(branch['parameter'][step], branch['states'][step]) for step in range(points[0]['step'], -1, -2)] + origin
+
+    return boundary
+
+
+if __name__ == '__main__':
+    # persistence boundary of one species in the (a, B) plane (see FigS3)
+    param_dict = {'b': 0.85, 'd': 0.2, 'p': 0.6, 'l1': 0.02, 'k1': 3, 'l2': 0, 'k2': 1, 'cw': 1, 'cb': 0, 'K': 1000,
+                  'a': 10, 'B': 0}
+    state = steady_state(no_mimicry, np.array([500, 500, 0, 0], dtype='float64'), param_dict)[0]
+    print(continuation(no_mimicry, state, param_dict, 'B', 1)['points'])
+    print(trace_boundary(no_mimicry, state, param_dict, 'B', 1, 'a', np.linspace(10, 0, 11)))
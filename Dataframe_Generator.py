@@ -1,73 +1,494 @@
+import json
 import pandas as pd
 import multiprocessing as mp
 import os
 from glob import glob
 import numpy.random as npr
+from functools import partial
+from itertools import chain, product
+import numpy as np
 
-from Functions_Library import solver, dslm, no_mimicry, mimicry
+from Functions_Library import solver, equilibrium_solver, ensemble_solver, solve_ensemble, low_density_growth, dslm, \
+    no_mimicry, mimicry, PARAMETER_NAMES
+from Solver_Cache import SolverCache
+from Dataset_IO import load_dataset, save_dataset, SCHEMA
+from Sweeps import default_sweep, get_sweep
 
+# engines computing the equilibrium of one parameter set, with the signature of solver
+ENGINES = {'solver': solver,
+           'steady': partial(solver, steady=True),
+           'equilibrium': equilibrium_solver,
+           'ensemble': ensemble_solver}
 
-def dataframe_generator(func=mimicry, sp2=True, N=5, comp=0.3, label=''):
+# engines solving whole chunks of parameter sets at once, used by run_engine instead of the engine of ENGINES
+BATCH_ENGINES = {'ensemble': solve_ensemble}
+
+# diagnostics of each simulation written as extra columns by dataframe_generator(diagnostics=True)
+DIAGNOSTICS = ('iterations', 'nfev', 'njev', 'wall_time', 'converged')
+
+# records of the results [eq_sp1, eq_sp2, coexistence, F1, M1, F2, M2] of the engines and of their diagnostics, named
+# and typed as the columns of the datasets
+RESULT_DTYPE = np.dtype([(name, SCHEMA[name]) for name in ('eq_sp1', 'eq_sp2', 'coexistence', 'F', 'M', 'f', 'm')])
+DIAGNOSTICS_DTYPE = np.dtype([(name, SCHEMA[name]) for name in DIAGNOSTICS])
+
+
+def run_engine(engine, func, parameters, workers=1, chunksize=None, diagnostics=False, grid=None):
+    """
+    :param engine: name of the engine in ENGINES (the engines of BATCH_ENGINES solving each chunk at once, without
+    diagnostics nor grid)
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param parameters: array or list of (AB,SR,ab,sr,b,d,p,l1,k1,l2,k2,cw,cb,K,a,B)
+    :param workers: number of processes used to run the simulations (1 runs them in the current process)
+    :param chunksize: number of simulations (or batches with grid) sent to a process at once (by default the
+    parameters are split in four chunks per process)
+    :param diagnostics: if True, the engine is called with full_output=True and its diagnostics are also returned
+    :param grid: shape of the grid of the sweep, parameters being made of whole batches: if given, each batch is solved
+    with warm starts in one process (see run_batch)
+    :return: structured array (see RESULT_DTYPE) of the results of the engine, in the order of parameters, and if
+    diagnostics is True the structured array of their diagnostics (see DIAGNOSTICS_DTYPE)
+    """
+    batch_engine = BATCH_ENGINES.get(engine)
+    if batch_engine is not None and (diagnostics or grid is not None):
+        raise ValueError("the '{0}' engine solves chunks of simulations at once, without diagnostics nor warm starts"
+                         .format(engine))
+    engine = partial(ENGINES[engine], full_output=True) if diagnostics else ENGINES[engine]
+
+    # results are written in preallocated arrays as they arrive, without list of results
+    sol = np.empty(len(parameters), dtype=RESULT_DTYPE)
+    info = np.empty(len(parameters), dtype=DIAGNOSTICS_DTYPE) if diagnostics else None
+
+    def store(outputs):
+        for i, output in enumerate(outputs):
+            if diagnostics:
+                output, diagnostic = output
+                info[i] = tuple(diagnostic[name] for name in DIAGNOSTICS)
+            sol[i] = tuple(output)
+
+    if batch_engine is not None:
+        # the chunks are the tasks, each one being integrated at once
+        size = chunksize or max(1, -(-len(parameters) // (4 * workers)))
+        tasks = [np.asarray(parameters[first:first + size], dtype='float64')
+                 for first in range(0, len(parameters), size)]
+        run, chunksize = partial(batch_engine, func), 1
+    elif grid is not None:
+        size = int(np.prod(grid))
+        tasks = [parameters[first:first + size] for first in range(0, len(parameters), size)]
+        run = partial(run_batch, engine, func, tuple(grid), diagnostics=diagnostics)
+    else:
+        tasks = parameters
+        run = partial(run_one, engine, func)
+    grouped = batch_engine is not None or grid is not None
+
+    if workers > 1:
+        if chunksize is None:
+            chunksize = max(1, -(-len(tasks) // (4 * workers)))
+        with mp.Pool(workers) as pool:
+            # imap keeps the order of 'parameters' whatever the order in which the chunks complete
+            outputs = pool.imap(run, tasks, chunksize=chunksize)
+            store(chain.from_iterable(outputs) if grouped else outputs)
+    else:
+        outputs = map(run, tasks)
+        store(chain.from_iterable(outputs) if grouped else outputs)
+
+    return (sol, info) if diagnostics else sol
+
+
+def run_one(engine, func, params):
+    """
+    :param engine: engine (function with the signature of solver)
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param params: (AB,SR,ab,sr,b,d,p,l1,k1,l2,k2,cw,cb,K,a,B)
+    :return: result of the engine
+    """
+    return engine(func, *params)
+
+
+def allee_risk(func, params):
+    """
+    The outcome may depend on the initial condition when the extinction of a species present at the start is locally
+    stable (Allee effect): its low-density growth rate (see Functions_Library.low_density_growth) is not positive, the
+    other species being at its initial abundance or absent.
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param params: (AB,SR,ab,sr,b,d,p,l1,k1,l2,k2,cw,cb,K,a,B)
+    :return: True if a warm start could reach another outcome than the initial condition of the parameter set
+    """
+    AB, SR, ab, sr = params[:4]
+    param_dict = dict(zip(PARAMETER_NAMES[4:], params[4:]))
+    state = np.array([AB * (1 - SR), AB * SR, ab * (1 - sr), ab * sr], dtype='float64')
+
+    for species, present in enumerate((AB > 0, ab > 0)):
+        if present:
+            alone = state.copy()
+            alone[2 * (1 - species):2 * (1 - species) + 2] = 0
+            if min(low_density_growth(func, state, param_dict, species),
+                   low_density_growth(func, alone, param_dict, species)) <= 0:
+                return True
+    return False
+
+
+def run_batch(engine, func, grid, block, diagnostics=False):
+    """
+    Solve a batch of a sweep with warm starts: each parameter set is integrated from the equilibrium of its nearest
+    neighbour already solved on the grid (the previous point along the last axis whose index is not 0) instead of the
+    initial condition given by AB, SR, ab and sr.
+    As the reached equilibrium may depend on the basin of attraction of the initial condition, the parameter set is
+    solved from its own initial condition when a species present at the start may not recover from low densities (see
+    allee_risk), when the neighbour lost a species present at the start, or when the persistence of a species differs
+    from the neighbour's.
+    :param engine: engine (function with the signature of solver accepting init)
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param grid: shape of the grid of the sweep
+    :param block: parameter sets of the batch, in the order of the grid
+    :param diagnostics: if True, the engine returns (result, info), the cost of a discarded warm start being added to
+    the 'nfev', 'njev' and 'wall_time' of the info
+    :return: list of the outputs of the engine, in the order of block
+    """
+    outputs = []
+    for cell, params in enumerate(block):
+        index = np.unravel_index(cell, grid)
+        moved = [axis for axis in range(len(grid)) if index[axis] > 0]
+
+        warm = None
+        if moved:
+            neighbour = list(index)
+            neighbour[moved[-1]] -= 1
+            previous = outputs[np.ravel_multi_index(neighbour, grid)]
+            previous = previous[0] if diagnostics else previous
+
+            AB, SR, ab, sr = params[:4]
+            start = [AB > 0, ab > 0]  # species present at the start
+            if all(previous[i] or not start[i] for i in range(2)) and not allee_risk(func, params):
+                warm = engine(func, *params, init=previous[3:7])
+                result = warm[0] if diagnostics else warm
+                if list(result[:2]) == list(previous[:2]):
+                    outputs.append(warm)
+                    continue
+
+        output = engine(func, *params)
+        if diagnostics and warm is not None:
+            for key in ('nfev', 'njev', 'wall_time'):
+                output[1][key] += warm[1][key]
+        outputs.append(output)
+
+    return outputs
+
+
+def results_array(sol):
+    """
+    :param sol: list of results of solver, or structured array of results
+    :return: structured array of the results (see RESULT_DTYPE)
+    """
+    if isinstance(sol, np.ndarray) and sol.dtype == RESULT_DTYPE:
+        return sol
+    results = np.empty(len(sol), dtype=RESULT_DTYPE)
+    for i, item in enumerate(sol):
+        results[i] = tuple(item)
+    return results
+
+
+def dataframe_generator(func=mimicry, sp2=True, N=5, comp=0.3, label='', workers=1, chunksize=None, seed=None,
+                        engine='solver', cache=None, stream=None, fmt='csv', sweep=None, diagnostics=False,
+                        warm_start=False):
     """
     :param func: function to use (no_mimicry, mimicry or dslm)
     :param sp2: True for two species, False for one species only
     :param N: number of simulations batches
     :param comp: interspecific competition value
+    :param label: suffix of the file name
+    :param workers: number of processes used to run the simulations (1 runs them in the current process)
+    :param chunksize: number of simulations sent to a process at once (by default the parameters are split in four
+    chunks per process)
+    :param seed: seed of the random generator drawing the random parameters, for reproducible datasets
+    :param engine: 'solver' (time integration), 'steady' (time integration stopped at equilibrium or extinction),
+    'equilibrium' (root finding with integration as fallback) or 'ensemble' (time integration of whole chunks of
+    simulations at once, see Functions_Library.solve_ensemble; without diagnostics nor warm starts)
+    :param cache: SolverCache (or path of its file) from which already solved parameters are read, the new results
+    being added to it
+    :param stream: if given, number of simulations per chunk: each chunk is appended to the csv file as soon as it is
+    computed and the progress is recorded in 'df_{label}.manifest.json', so that an interrupted run called again with
+    the same arguments resumes after the last written chunk
+    :param fmt: format of the dataset, 'csv', 'parquet', 'feather' or 'npz' (see Dataset_IO); binary formats record
+    the model, the sweep, the engine and the seed as metadata. Streamed runs are written as csv and converted at the end
+    :param sweep: SweepSpec, name of a sweep of Sweeps.SWEEPS ('aB', 'plk', 'lk', 'l1l2', 'k1k2', 'l1l2k1k2',
+    'regression') or path of a JSON sweep file. By default, the (a, B) sweep given by sp2 and comp (see
+    Sweeps.default_sweep)
+    :param diagnostics: if True, add the columns of DIAGNOSTICS measured for each simulation (number of restart
+    iterations, evaluations of the system and of its Jacobian matrix, wall time and convergence), to find the
+    expensive regions of the parameter space; not available with a cache
+    :param warm_start: if True, the points of the grid of a batch are solved in one process, each one starting from
+    the equilibrium of its neighbour unless the outcome may depend on the initial condition (see run_batch), which
+    reduces the number of restarts of the sweeps studying equilibria; not available with a cache
 
-    parameters=[(AB,SR,ab,sr,b,d,p,l1,k1,l2,k2,cw,cb,K,a,B)]
-        - fixed parameters are replaced by a number
-        - parameters to be drawn randomly in each batch of simulations must be indicated by rcond[] and placed
-        in 'random_cond' object, specifying the minimum and maximum values of the interval
-        - parameters of interest, for which different values are defined, must remain in letter form. The values for
-        which one wants to run simulations must be indicated in the form: for X in [x1,x2...xn]
+    The parameters (AB,SR,ab,sr,b,d,p,l1,k1,l2,k2,cw,cb,K,a,B) are described by the sweep (see Sweeps.SweepSpec):
+        - fixed parameters are given a number
+        - parameters to be drawn randomly in each batch of simulations are given the minimum and maximum values of
+        the interval
+        - parameters of interest are given the values for which one wants to run simulations, every combination
+        of them being simulated in each batch
 
-
-    :return: a csv dataframe with all parameters value, abundances, male proportions and state at the equilibrium.
+    :return: a dataframe file with all parameters value, abundances, male proportions and state at the equilibrium.
     """
-    if sp2 == False:
-        comp = 0
-        random_cond = [[npr.uniform(1, 1000), npr.uniform(0.2, 0.8), 0, 0, npr.uniform(0.7, 1), npr.uniform(0.1, 0.3),
-                        npr.uniform(0.3, 0.7)] for i in range(N)]
+    spec = default_sweep(sp2, comp) if sweep is None else get_sweep(sweep)
+
+    if stream is not None:
+        manifest = read_manifest("./df_{0}.csv".format(label), {'func': func.__name__, 'sweep': spec.to_dict(),
+                                                                 'N': N, 'engine': engine,
+                                                                 'diagnostics': diagnostics,
+                                                                 'warm_start': warm_start}, seed)
+        seed = manifest['seed']
+    elif seed is None:
+        seed = npr.SeedSequence().entropy  # drawn explicitly to be recorded in the metadata
+
+    parameters = spec.parameters(N, seed)
+
+    stem = "./df_{0}".format(label)
+    metadata = {'model': func.__name__,
+                'sweep': spec.to_dict(),
+                'N': N,
+                'engine': engine,
+                'seed': seed,
+                'warm_start': warm_start}
+    grid = parameters.grid_shape if warm_start else None
+
+    if stream is None:
+        parameters = parameters[:]
+        if diagnostics:
+            sol, info = solve_parameters(func, parameters, engine, workers, chunksize, cache, diagnostics=True,
+                                         grid=grid)
+        else:
+            sol, info = solve_parameters(func, parameters, engine, workers, chunksize, cache, grid=grid), None
+        save_dataset(results_dataframe(parameters, sol, info), stem, fmt, metadata)
     else:
-        random_cond = [[npr.uniform(1, 1000), npr.uniform(0.2, 0.8), npr.uniform(1, 1000), npr.uniform(0.2, 0.8),
-                        npr.uniform(0.7, 1), npr.uniform(0.1, 0.3), npr.uniform(0.3, 0.7)] for i in range(N)]
-
-    parameters = [
-        (rcond[0], rcond[1], rcond[2], rcond[3], rcond[4], rcond[5], 0.6, 0.02, rcond[6], 0, 1, 1, comp, 1000, a, B)
-        for rcond in random_cond
-        for a in [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10]  # parameter of interest 1
-        for B in [0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1]  # parameter of interest 2
-        ]
-
-    sol = [solver(func, AB, SR, ab, sr, b, d, p, l1, k1, l2, k2, cw, cb, K, a, B)
-           for (AB, SR, ab, sr, b, d, p, l1, k1, l2, k2, cw, cb, K, a, B) in parameters]
-
-    df = pd.DataFrame({'AB': [item[0] for item in parameters],
-                       'SR': [item[1] for item in parameters],
-                       'ab': [item[2] for item in parameters],
-                       'sr': [item[3] for item in parameters],
-                       'b': [item[4] for item in parameters],
-                       'd': [item[5] for item in parameters],
-                       'p': [item[6] for item in parameters],
-                       'l1': [item[7] for item in parameters],
-                       'k1': [item[8] for item in parameters],
-                       'l2': [item[9] for item in parameters],
-                       'k2': [item[10] for item in parameters],
-                       'cw': [item[11] for item in parameters],
-                       'cb': [item[12] for item in parameters],
-                       'K': [item[13] for item in parameters],
-                       'a': [item[14] for item in parameters],
-                       'B': [item[15] for item in parameters],
-                       'eq_sp1': [item[0] for item in sol],
-                       'eq_sp2': [item[1] for item in sol],
-                       'coexistence': [item[2] for item in sol],
-                       'F': [item[3] for item in sol],
-                       'M': [item[4] for item in sol],
-                       'f': [item[5] for item in sol],
-                       'm': [item[6] for item in sol]
-                       })
-
-    df.to_csv("./df_{0}.csv".format(label))
+        manifest['n_parameters'] = len(parameters)
+        stream_to_csv(stem + '.csv', manifest, iter_results(func, parameters, engine, workers, chunksize, cache,
+                                                            chunk=stream, start=manifest['done'],
+                                                            diagnostics=diagnostics, grid=grid))
+        if fmt != 'csv':
+            save_dataset(load_dataset(stem + '.csv'), stem, fmt, metadata)
+
+
+def solve_parameters(func, parameters, engine='solver', workers=1, chunksize=None, cache=None, diagnostics=False,
+                     grid=None):
+    """
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param parameters: array or list of (AB,SR,ab,sr,b,d,p,l1,k1,l2,k2,cw,cb,K,a,B)
+    :param engine: name of the engine in ENGINES
+    :param workers: number of processes used to run the simulations
+    :param chunksize: number of simulations sent to a process at once
+    :param cache: SolverCache (or path of its file), None to compute every parameter set
+    :param diagnostics: if True, also return the structured array of the diagnostics of each simulation (see solver)
+    :param grid: shape of the grid of the sweep to solve whole batches with warm starts (see run_batch), None to solve
+    every parameter set from its initial condition
+    :return: structured array (see RESULT_DTYPE) of the results of the engine, in the order of parameters
+    """
+    if diagnostics:
+        if cache is not None:
+            raise ValueError("diagnostics are only measured on computed simulations, they cannot use a cache")
+        return run_engine(engine, func, parameters, workers, chunksize, diagnostics=True, grid=grid)
+
+    if cache is None:
+        return run_engine(engine, func, parameters, workers, chunksize, grid=grid)
+
+    if grid is not None:
+        raise ValueError("warm starts solve whole batches from their neighbours, they cannot use a cache")
+
+    if not isinstance(cache, SolverCache):
+        cache = SolverCache(cache)
+    return results_array(cache.solve_many(func, parameters, partial(run_engine, engine, func, workers=workers,
+                                                                      chunksize=chunksize), settings=engine))
+
+
+def results_dataframe(parameters, sol, diagnostics=None, start=0):
+    """
+    :param parameters: array or list of (AB,SR,ab,sr,b,d,p,l1,k1,l2,k2,cw,cb,K,a,B)
+    :param sol: structured array (see RESULT_DTYPE) or list of the corresponding results of solver
+    :param diagnostics: structured array of the corresponding diagnostics of solver, added as the columns of
+    DIAGNOSTICS
+    :param start: index of the first simulation
+    :return: dataframe with all parameters value, abundances and state at the equilibrium
+    """
+    parameters = np.asarray(parameters, dtype='float64').reshape(-1, len(PARAMETER_NAMES))
+    sol = results_array(sol)
+
+    # the columns are given to pandas as arrays, without intermediate lists
+    columns = {name: parameters[:, j] for j, name in enumerate(PARAMETER_NAMES)}
+    columns.update({name: sol[name] for name in RESULT_DTYPE.names})
+    if diagnostics is not None:
+        columns.update({name: diagnostics[name] for name in DIAGNOSTICS})
+
+    return pd.DataFrame(columns, index=range(start, start + len(parameters)))
+
+
+def iter_results(func, parameters, engine='solver', workers=1, chunksize=None, cache=None, chunk=10000, start=0,
+                 diagnostics=False, grid=None):
+    """
+    Solve the parameters by chunks, so that the results of a chunk can be saved before the next one is computed.
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param parameters: sliceable sequence of (AB,SR,ab,sr,b,d,p,l1,k1,l2,k2,cw,cb,K,a,B), e.g. Sweeps.SweepParameters
+    :param engine: name of the engine in ENGINES
+    :param workers: number of processes used to run the simulations
+    :param chunksize: number of simulations sent to a process at once
+    :param cache: SolverCache (or path of its file), None to compute every parameter set
+    :param chunk: number of simulations per chunk
+    :param start: index of the first parameter set to solve (the previous ones being skipped)
+    :param diagnostics: if True, add the columns of DIAGNOSTICS
+    :param grid: shape of the grid of the sweep to solve with warm starts (see run_batch), chunks being then rounded to
+    whole batches
+    :return: generator of dataframes (see results_dataframe) of successive chunks
+    """
+    if grid is not None:
+        size = int(np.prod(grid))
+        chunk = max(1, chunk // size) * size
+
+    for first in range(start, len(parameters), chunk):
+        chunk_parameters = parameters[first:first + chunk]
+        if diagnostics:
+            sol, info = solve_parameters(func, chunk_parameters, engine, workers, chunksize, cache, diagnostics=True,
+                                         grid=grid)
+        else:
+            sol, info = solve_parameters(func, chunk_parameters, engine, workers, chunksize, cache, grid=grid), None
+        yield results_dataframe(chunk_parameters, sol, info, start=first)
+
+
+def read_manifest(path, settings, seed=None):
+    """
+    :param path: path of the csv file
+    :param settings: JSON-serializable dictionary of the settings of the run
+    :param seed: seed of the run, None to reuse the seed of an interrupted run or to draw a new one
+    :return: progress manifest of the run, the one of an interrupted run with the same settings if it exists
+    """
+    manifest_path = os.path.splitext(path)[0] + '.manifest.json'
+    # settings as read back from the manifest (tuples becoming lists)
+    settings = json.loads(json.dumps(settings))
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+        if manifest['settings'] != settings or (seed is not None and seed != manifest['seed']):
+            raise ValueError("{0} belongs to a run with other settings, remove it to start a new run".format(
+                manifest_path))
+        return manifest
+
+    if seed is None:
+        seed = npr.SeedSequence().entropy
+
+    return {'settings': settings, 'seed': seed, 'path': manifest_path, 'n_parameters': None, 'done': 0, 'bytes': 0,
+            'complete': False}
+
+
+def write_manifest(manifest):
+    """
+    :param manifest: progress manifest, atomically written to manifest['path']
+    """
+    with open(manifest['path'] + '.tmp', 'w') as file:
+        json.dump(manifest, file, indent=1)
+    os.replace(manifest['path'] + '.tmp', manifest['path'])
+
+
+def stream_to_csv(path, manifest, frames):
+    """
+    Append each dataframe to the csv file as soon as it is computed, and record the progress in the manifest.
+    Rows written after the last recorded chunk (by a run interrupted while writing) are discarded.
+    :param path: path of the csv file
+    :param manifest: progress manifest of the run
+    :param frames: iterable of dataframes of successive chunks
+    """
+    with open(path, 'ab') as file:
+        file.truncate(manifest['bytes'])
+
+    for df in frames:
+        with open(path, 'a', newline='') as file:
+            df.to_csv(file, header=manifest['done'] == 0)
+            file.flush()
+            os.fsync(file.fileno())
+            manifest['bytes'] = file.tell()
+        manifest['done'] = int(df.index[-1]) + 1
+        write_manifest(manifest)
+
+    manifest['complete'] = True
+    write_manifest(manifest)
+
+
+def adaptive_dataframe_generator(func=mimicry, sweep='aB', axes=('a', 'B'), N=5, depth=3, thresholds=(0.25, 0.75),
+                                 label='', workers=1, chunksize=None, seed=None, engine='solver', cache=None,
+                                 fmt='csv'):
+    """
+    Adaptive counterpart of dataframe_generator for sweeps over two parameters of interest: the grid of the sweep is
+    used as a coarse grid, and the cells where the state at the equilibrium changes are recursively divided in four.
+    A cell is divided when the frequencies of persistence of sp1, persistence of sp2 or coexistence at its corners
+    (averaged over the N batches) are not all below thresholds[0] or all above thresholds[1].
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param sweep: SweepSpec, name of a sweep of Sweeps.SWEEPS or path of a JSON sweep file, whose grid is made of the
+    two axes
+    :param axes: the two parameters of interest
+    :param N: number of simulations batches, the same random parameters being used at every point
+    :param depth: number of refinements
+    :param thresholds: frequencies between which a corner is considered to be on a boundary
+    :param label: suffix of the file name
+    :param workers: number of processes used to run the simulations
+    :param chunksize: number of simulations sent to a process at once
+    :param seed: seed of the random generator drawing the random parameters
+    :param engine: name of the engine in ENGINES
+    :param cache: SolverCache (or path of its file), None to compute every parameter set
+    :param fmt: format of the dataset (see Dataset_IO)
+    :return: a dataframe file, with the same columns as dataframe_generator, of the simulations at every point
+    """
+    spec = get_sweep(sweep)
+    if sorted(spec.grid) != sorted(axes):
+        raise ValueError("the grid of the sweep must be made of the two axes {0}".format(axes))
+
+    if seed is None:
+        seed = npr.SeedSequence().entropy
+
+    base = spec.parameters(N, seed)[::spec.grid_size]  # fixed and random parameters of each batch
+    columns = {name: [PARAMETER_NAMES.index(name)] + [PARAMETER_NAMES.index(tied)
+                                                     for tied, other in spec.tied.items() if other == name]
+               for name in axes}
+
+    outcomes = {}  # frequencies of persistence of sp1, persistence of sp2 and coexistence at each point
+    blocks = []
+    sol = []
+
+    def evaluate(points):
+        points = [point for point in dict.fromkeys(points) if point not in outcomes]
+        if not points:
+            return
+        block = np.repeat(base[None], len(points), axis=0)
+        for k, name in enumerate(axes):
+            block[:, :, columns[name]] = np.array([point[k] for point in points])[:, None, None]
+        block = block.reshape(-1, len(PARAMETER_NAMES))
+
+        block_sol = solve_parameters(func, block, engine, workers, chunksize, cache)
+        states = np.column_stack([block_sol[name] for name in ('eq_sp1', 'eq_sp2', 'coexistence')])
+        outcomes.update(zip(points, states.reshape(len(points), N, 3).mean(axis=1)))
+        blocks.append(block)
+        sol.append(block_sol)
+
+    def on_boundary(cell):
+        x0, x1, y0, y1 = cell
+        classes = np.digitize([outcomes[point] for point in product((x0, x1), (y0, y1))], thresholds)
+        return np.any(classes == 1) or np.any(classes != classes[0])
+
+    xs, ys = spec.grid[axes[0]], spec.grid[axes[1]]
+    evaluate(list(product(xs, ys)))
+    cells = [(xs[i], xs[i + 1], ys[j], ys[j + 1]) for i in range(len(xs) - 1) for j in range(len(ys) - 1)]
+
+    for level in range(depth):
+        cells = [sub_cell
+                 for (x0, x1, y0, y1) in cells if on_boundary((x0, x1, y0, y1))
+                 for xm, ym in [(round((x0 + x1) / 2, 12), round((y0 + y1) / 2, 12))]
+                 for sub_cell in [(x0, xm, y0, ym), (xm, x1, y0, ym), (x0, xm, ym, y1), (xm, x1, ym, y1)]]
+        evaluate([point for (x0, x1, y0, y1) in cells for point in product((x0, x1), (y0, y1))])
+
+    parameters = np.vstack(blocks)
+    metadata = {'model': func.__name__,
+                'sweep': spec.to_dict(),
+                'N': N,
+                'engine': engine,
+                'seed': seed,
+                'adaptive': {'axes': list(axes), 'depth': depth, 'thresholds': list(thresholds)}}
+
+    save_dataset(results_dataframe(parameters, np.concatenate(sol)), "./df_{0}".format(label), fmt, metadata)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,113 @@
+"""
+Reading and writing of the datasets generated by Dataframe_Generator.
+Besides csv, datasets can be stored in columnar binary formats (Parquet or Feather, which require pyarrow, or
+compressed NumPy npz) with typed columns and metadata describing how they were generated.
+This module is imported by the figure scripts to load the datasets whatever their format.
+"""
+
+### libraries
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# column types of the datasets (and of their optional diagnostics), states at the equilibrium being stored as int8
+SCHEMA = {'AB': 'float64', 'SR': 'float64', 'ab': 'float64', 'sr': 'float64', 'b': 'float64', 'd': 'float64',
+          'p': 'float64', 'l1': 'float64', 'k1': 'float64', 'l2': 'float64', 'k2': 'float64', 'cw': 'float64',
+          'cb': 'float64', 'K': 'float64', 'a': 'float64', 'B': 'float64', 'eq_sp1': 'int8', 'eq_sp2': 'int8',
+          'coexistence': 'int8', 'F': 'float64', 'M': 'float64', 'f': 'float64', 'm': 'float64',
+          'iterations': 'int16', 'nfev': 'int64', 'njev': 'int64', 'wall_time': 'float64', 'converged': 'int8'}
+
+# extensions of the formats, in the order of preference of load_dataset between files of the same age
+FORMATS = {'parquet': '.parquet', 'feather': '.feather', 'npz': '.npz', 'csv': '.csv'}
+
+METADATA_KEY = b'aculeata'
+
+
+def typed(df):
+    """
+    :param df: dataset
+    :return: dataset with the columns of SCHEMA converted to their type
+    """
+    return df.astype({column: dtype for column, dtype in SCHEMA.items() if column in df.columns})
+
+
+def save_dataset(df, stem, fmt='csv', metadata=None):
+    """
+    :param df: dataset
+    :param stem: path of the file without extension (e.g. './df_two_mimicry')
+    :param fmt: 'csv', 'parquet', 'feather' or 'npz'
+    :param metadata: JSON-serializable dictionary describing the dataset (ignored for csv)
+    :return: path of the file
+    """
+    path = stem + FORMATS[fmt]
+    metadata = json.dumps(metadata or {})
+
+    if fmt == 'csv':
+        df.to_csv(path)
+    elif fmt == 'npz':
+        df = typed(df)
+        np.savez_compressed(path, __index__=df.index.to_numpy(), __metadata__=np.array(metadata),
+                            **{column: df[column].to_numpy() for column in df.columns})
+    else:
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(typed(df))
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), METADATA_KEY: metadata.encode()})
+        if fmt == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(table, path)
+        else:
+            import pyarrow.feather as feather
+            feather.write_feather(table, path)
+
+    return path
+
+
+def find_dataset(name, folder='./data'):
+    """
+    :param name: name of the dataset without extension (e.g. 'df_two_mimicry')
+    :param folder: folder of the datasets
+    :return: path of the dataset, the most recently modified one when it is stored in several formats (binary formats
+    being preferred to csv between files of the same age), so that a regenerated dataset is not hidden by a stale one
+    """
+    paths = [os.path.join(folder, name + extension) for extension in FORMATS.values()]
+    paths = [path for path in paths if os.path.exists(path)]
+    if not paths:
+        raise FileNotFoundError("no dataset '{0}' in {1}".format(name, folder))
+    return max(paths, key=os.path.getmtime)
+
+
+def load_dataset(name, folder='./data', columns=None):
+    """
+    :param name: name of the dataset without extension (e.g. 'df_two_mimicry'), or path of the file
+    :param folder: folder of the datasets
+    :param columns: list of the columns to read, None to read them all
+    :return: dataset, its metadata being in df.attrs['metadata']
+    """
+    path = name if os.path.splitext(name)[1] in FORMATS.values() else find_dataset(name, folder)
+    extension = os.path.splitext(path)[1]
+    metadata = {}
+
+    if extension == '.csv':
+        usecols = None if columns is None else lambda column: column in columns or column in ('', 'Unnamed: 0')
+        df = pd.read_csv(path, index_col=0, usecols=usecols)
+    elif extension == '.npz':
+        with np.load(path) as data:
+            metadata = json.loads(str(data['__metadata__']))
+            df = pd.DataFrame({column: data[column] for column in data.files
+                               if not column.startswith('__') and (columns is None or column in columns)},
+                              index=data['__index__'])
+    else:
+        if extension == '.parquet':
+            import pyarrow.parquet as pq
+            table = pq.read_table(path, columns=columns)
+        else:
+            import pyarrow.feather as feather
+            table = feather.read_table(path, columns=columns)
+        metadata = json.loads((table.schema.metadata or {}).get(METADATA_KEY, b'{}'))
+        df = table.to_pandas()
+
+    df.attrs['metadata'] = metadata
+    return df
@@ -1,9 +1,10 @@
 ### Libraries
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib as mpl
 
+from Aggregation import load_summary
+
 ### Colormap
 cmap = mpl.colormaps['PuOr']
 cmap.set_bad(color="black")
@@ -33,30 +34,26 @@ cb1.ax.set_yticklabels(['0', 'Female-biased', 'Equally balanced', 'Male-biased',
 cb1.ax.set_title('Proportion of male \n at equilibrium', fontsize=15, fontweight='bold')
 
 ### Data and plotting
-df_name = 'df_one_no_mimicry_plk.csv'
+df_name = 'df_one_no_mimicry_plk'
 
 lev = np.arange(0,1.001, 0.001).tolist()
 cs_lev = np.arange(0,1.05, 0.05).tolist()
 
-for i in range(2):
-    df_brut = pd.read_csv("./data/{0}".format(df_name))
+cells = load_summary(df_name, by=['k1', 'p', 'l1'])
+summary = load_summary(df_name, by=['k1', 'p', 'l1'], means=['sr'], derived={'sr': 'M / (M + F)'},
+                       query='eq_sp1 == 1')  # male proportion of the persisting populations
 
-    df = df_brut.loc[(df_brut['k1'] == [2, 5][i])]
+for i in range(2):
+    df = summary.loc[(summary['k1'] == [2, 5][i])]
 
     ax[i].set_xlabel(r'Predation rate $p$', fontsize=20, fontweight='bold')
     ax[i].set_ylabel(r'Defence level $\lambda$', fontsize=20, fontweight='bold')
     ax[i].tick_params(axis='both', which='major', labelsize=15)
 
-    aspect = df_brut['p'].unique()[-1] / df_brut['l1'].unique()[-1]
+    aspect = cells['p'].unique()[-1] / cells['l1'].unique()[-1]
     ax[i].set_aspect(aspect)
     ax[i].set_facecolor(color='black')
 
-    df['sr'] = df['M'] / (df['M'] + df['F'])
-
-    df = df.loc[df.eq_sp1 == 1]
-
-    df['av_sr'] = df['sr'].groupby([df['p'], df['l1']]).transform('mean')
-
     ax[i].tricontourf(df['p'], df['l1'], df['av_sr'], levels=lev, cmap=cmap,
                       vmin=0, vmax=1, alpha=1, antialiased=False)
 
@@ -1,8 +1,9 @@
 ### Libraries
-import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib as mpl
 
+from Aggregation import load_summary
+
 
 ### Colormap
 cmap = mpl.colormaps['Blues_r']
@@ -32,24 +33,19 @@ cb1.ax.tick_params(labelsize=15)
 cb1.ax.set_title('Frequency of \n persistence', size=15, fontweight='bold', y=1.01)
 
 ### Data
-df = pd.read_csv("./data/df_one_no_mimicry_aB.csv")
+df = load_summary('df_one_no_mimicry_aB', by=['a', 'B'], means=['eq_sp1'])
 
 lev = [0, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.35, 0.4, 0.45, 0.5, 0.55, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95, 1,
        1.01]
 
-df['sr'] = df['M'] / (df['M'] + df['F'])
-
-df['av_sp1'] = df['eq_sp1'].groupby([df['a'], df['B']]).transform('mean')
-df['av_sr'] = df['sr'].groupby([df['a'], df['B']]).transform('mean')
-
 ### Plotting
 aspect = df['a'].unique()[-1] / df['B'].unique()[-1]
 ax.set_aspect(aspect)
 
-ax.tricontourf(df['a'], df['B'], df['av_sp1'], levels=lev, cmap=cmap,
+ax.tricontourf(df['a'], df['B'], df['av_eq_sp1'], levels=lev, cmap=cmap,
                vmin=0, vmax=1, alpha=1, antialiased=False)
 
-cs = ax.tricontour(df['a'], df['B'], df['av_sp1'], levels=[0.35, 0.5, 0.65], colors=['lightblue', 'blue', 'darkblue'],
+cs = ax.tricontour(df['a'], df['B'], df['av_eq_sp1'], levels=[0.35, 0.5, 0.65], colors=['lightblue', 'blue', 'darkblue'],
                    linestyles=':', vmin=0, vmax=1, alpha=1, antialiased=False, linewidths=3)
 
 ax.clabel(cs, fontsize=15, inline_spacing=0.2)
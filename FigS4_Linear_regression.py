@@ -1,81 +1,118 @@
 ### Libraries
+import json
+import os
+
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-import numpy.random as npr
 import seaborn as sns
 
-from Functions_Library import solver, no_mimicry
+from Functions_Library import no_mimicry
+from Dataframe_Generator import solve_parameters, results_dataframe
+from Dataset_IO import load_dataset, save_dataset
+from Sweeps import SWEEPS
 from sklearn.linear_model import LinearRegression
 from sklearn.feature_selection import f_regression
 
 
-stats = []
-all_X = np.array([], dtype='float64')
-all_Y = np.array([], dtype='float64')
-
-### Set the figure
-fig, ax = plt.subplots()
-
-ax.set_xlim(0, 1)
-ax.set_xlabel(r'predation rate $p$', fontsize=20, fontweight='bold')
-ax.set_ylabel(r'proportion of male at equilibrium $\rho_*$', fontsize=20, fontweight='bold')
-ax.tick_params(axis='both', which='major', labelsize=15)
-
-### Data
-for i in range(4):
-    h = [2, 3, 4, 5][i]
-    col = ['red', 'blue', 'orange', 'green'][i]
-
-    random_cond = [[npr.uniform(1, 1000), npr.uniform(0.2, 0.8), 0, 0,
-                    npr.uniform(0.7, 1), npr.uniform(0.1, 0.3), npr.uniform(0, 1)] for i in range(5000)]
-
-    sol = [
-        solver(no_mimicry, cond[0], cond[1], cond[2], cond[3], cond[4], cond[5], cond[6], 0.01, h, 0, 1, 1, 0, 1000, 5,
-               0.8) for cond in random_cond]
-
-    M = [item[4] for item in sol]
-    F = [item[3] for item in sol]
-    E = [item[0] for item in sol]
-
-    SR = [M[i] / (F[i] + M[i]) if E[i] == 1 else -1 for i in range(5000)]
-
-    X = np.array([cond[6] for cond in random_cond], dtype='float64')
-    Y = np.array(SR, dtype='float64')
-
-    X = X[Y != -1]
-    Y = Y[Y != -1]
-
-    all_X = np.append(all_X, X)
-    all_Y = np.append(all_Y, Y)
-
-    Xcol = X.reshape((-1, 1))
-
-    modeleReg = LinearRegression()
-
-    modeleReg.fit(Xcol, Y)
-    freg = f_regression(Xcol, Y)
-
-    stats.append(
-        'h = {0}'.format(h) + ', df = {0}'.format(len(Y))+', F = {0}'.format(freg[0]) + ', p = {0}'.format(freg[1]) +
-        ', coef = {0}'.format(modeleReg.coef_))
-
-    sns.regplot(x=X, y=Y, color=col, ax=ax, scatter=True, scatter_kws={'alpha': 0.3}, label='h = {0}'.format(h),
-                line_kws={'linewidth': 3})
-
-print(stats)
-
-all_Xcol = all_X.reshape((-1, 1))
-all_modeleReg = LinearRegression()
-print(len(all_Y))
-
-all_modeleReg.fit(all_Xcol, all_Y)
-all_freg = f_regression(all_Xcol, all_Y)
-
-score = all_modeleReg.score(all_Xcol, all_Y)
-
-print('all included' + ', df = {0}'.format(len(all_Y))+', F = {0}'.format(all_freg[0]) + ', p = {0}'.format(all_freg[1])
-      + ', coef = {0}'.format(all_modeleReg.coef_))
-
-ax.legend(loc='best', prop={'size': 20})
-plt.show()
+def regression_study(N=5000, seed=0, workers=None, engine='solver', cache=None, name='df_one_no_mimicry_regression',
+                     folder='./data'):
+    """
+    Simulations of one species for random initial conditions, demographic rates and predation rates, for each
+    investment in sons h of the 'regression' sweep (see Sweeps). The conditions of each h are drawn independently, so
+    that the observations of the regression of all h are independent. The dataset is stored in the folder of the
+    datasets and reused by the next calls with the same seed and engine: a larger N only solves the additional
+    simulations, a smaller N reads the first ones.
+    :param N: number of random conditions of each h
+    :param seed: seed of the random generator (np.random.default_rng) drawing the conditions
+    :param workers: number of processes used to run the simulations (by default one per core)
+    :param engine: name of the engine in Dataframe_Generator.ENGINES
+    :param cache: SolverCache (or path of its file), None to compute every parameter set
+    :param name: name of the dataset without extension
+    :param folder: folder of the datasets
+    :return: dataset of the N * 4 simulations, with the sex-ratio at equilibrium 'rho' (NaN if the species is extinct)
+    """
+    spec = SWEEPS['regression']
+    G = spec.grid_size
+    # one batch of the sweep per simulation, of which only one h is kept: simulation i has the h of index i % G
+    parameters = spec.parameters(N * G, seed)
+    # metadata as read back from the dataset (tuples of the sweep becoming lists)
+    metadata = json.loads(json.dumps({'model': no_mimicry.__name__, 'sweep': spec.to_dict(), 'N': N,
+                                      'engine': engine, 'seed': seed, 'design': 'independent'}))
+
+    # the draws of the first batches do not depend on N, so the stored simulations are the first ones of this study
+    done = 0
+    try:
+        df = load_dataset(name, folder)
+        stored = df.attrs['metadata']
+        if all(stored.get(key) == metadata[key] for key in ('model', 'sweep', 'engine', 'seed', 'design')):
+            done = min(stored['N'], N)
+    except FileNotFoundError:
+        pass
+
+    if done < N:
+        simulations = np.arange(done * G, N * G)
+        new = parameters[done * G * G:][(simulations - done * G) * G + simulations % G]
+        sol = solve_parameters(no_mimicry, new, engine, workers or os.cpu_count(), cache=cache)
+        frames = [df.iloc[:done * G]] if done else []
+        df = pd.concat(frames + [results_dataframe(new, sol, start=done * G)])
+        save_dataset(df, os.path.join(folder, name), 'npz', metadata)
+
+    df = df.iloc[:N * G].copy()
+    df['rho'] = np.where(df['eq_sp1'] == 1, df['M'] / (df['F'] + df['M']), np.nan)
+    return df
+
+
+if __name__ == '__main__':
+    df = regression_study()
+
+    stats = []
+
+    ### Set the figure
+    fig, ax = plt.subplots()
+
+    ax.set_xlim(0, 1)
+    ax.set_xlabel(r'predation rate $p$', fontsize=20, fontweight='bold')
+    ax.set_ylabel(r'proportion of male at equilibrium $\rho_*$', fontsize=20, fontweight='bold')
+    ax.tick_params(axis='both', which='major', labelsize=15)
+
+    ### Regressions for each investment in sons
+    df = df[df['eq_sp1'] == 1]
+    for h, col in zip([2, 3, 4, 5], ['red', 'blue', 'orange', 'green']):
+        X = df.loc[df['k1'] == h, 'p'].to_numpy(dtype='float64')
+        Y = df.loc[df['k1'] == h, 'rho'].to_numpy(dtype='float64')
+
+        Xcol = X.reshape((-1, 1))
+
+        modeleReg = LinearRegression()
+
+        modeleReg.fit(Xcol, Y)
+        freg = f_regression(Xcol, Y)
+
+        stats.append(
+            'h = {0}'.format(h) + ', df = {0}'.format(len(Y)) + ', F = {0}'.format(freg[0]) +
+            ', p = {0}'.format(freg[1]) + ', coef = {0}'.format(modeleReg.coef_))
+
+        sns.regplot(x=X, y=Y, color=col, ax=ax, scatter=True, scatter_kws={'alpha': 0.3}, label='h = {0}'.format(h),
+                    line_kws={'linewidth': 3})
+
+    print(stats)
+
+    ### Regression for all investments in sons
+    all_X = df['p'].to_numpy(dtype='float64')
+    all_Y = df['rho'].to_numpy(dtype='float64')
+
+    all_Xcol = all_X.reshape((-1, 1))
+    all_modeleReg = LinearRegression()
+    print(len(all_Y))
+
+    all_modeleReg.fit(all_Xcol, all_Y)
+    all_freg = f_regression(all_Xcol, all_Y)
+
+    score = all_modeleReg.score(all_Xcol, all_Y)
+
+    print('all included' + ', df = {0}'.format(len(all_Y)) + ', F = {0}'.format(all_freg[0]) +
+          ', p = {0}'.format(all_freg[1]) + ', coef = {0}'.format(all_modeleReg.coef_))
+
+    ax.legend(loc='best', prop={'size': 20})
+    plt.show()
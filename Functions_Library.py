@@ -5,9 +5,13 @@ This module is imported at the beginning of each script.
 """
 
 ### libraries
+import math
 import numpy as np
 from numpy import exp
+from functools import lru_cache
+from time import perf_counter
 from scipy.integrate import odeint
+from scipy.optimize import root
 
 
 def g_(k, rho):
@@ -136,7 +140,538 @@ def dslm(n, t, param_dict):
     ], dtype='float64'))
 
 
-def solver(func, AB, SR, ab, sr, b, d, p, l1, k1, l2, k2, cw, cb, K, a, B):
+# population below which the gradient of a proportion is set to 0 (see _proportion)
+PROPORTION_TINY = np.finfo('float64').eps ** 2
+
+
+@lru_cache(maxsize=None)
+def _indicator_array(indices, ndim):
+    return np.isin(np.arange(4), indices).astype('float64').reshape((4,) + (1,) * ndim)
+
+
+def _indicator(n, indices):
+    """
+    :param n: array containing number of females and males [F1,M1,F2,M2]
+    :param indices: indices of the state variables
+    :return: gradient of sum(n[indices]) with respect to n, broadcastable against n
+    """
+    return _indicator_array(indices, np.ndim(n[0]))
+
+
+def _proportion(n, num, den):
+    """
+    :param n: array containing number of females and males [F1,M1,F2,M2]
+    :param num: indices of n summed at the numerator
+    :param den: indices of n summed at the denominator
+    :return: proportion sum(n[num]) / sum(n[den]) (0 for an empty population) and its gradient with respect to n (0
+    for a population below PROPORTION_TINY, whose 1 / s ** 2 would overflow)
+    """
+    m = sum(n[i] for i in num)
+    s = sum(n[i] for i in den)
+    populated = s > 0
+    value = m / np.where(populated, s, 1) * populated
+    resolved = s > PROPORTION_TINY
+    grad = (_indicator(n, num) - _indicator(n, den) * value) / np.where(resolved, s, 1) * resolved
+    return value, grad
+
+
+def _jacobian_rows(n, param_dict, rho1, rho2, DF1, DM1, DF2, DM2):
+    """
+    Jacobian matrix shared by the three systems, which only differ by the denominators of the predation terms
+    :param n: array containing number of females and males [F1,M1,F2,M2]
+    :param param_dict: dictionary for all parameters
+    :param rho1, rho2: male proportions of each species and their gradients
+    :param DF1, DM1, DF2, DM2: denominators of the predation terms of F1, M1, F2, M2 and their gradients
+    :return: array J[i, j] = d(dn_i/dt)/dn_j
+    """
+    b = param_dict['b']
+    d = param_dict['d']
+    p = param_dict['p']
+    l1 = param_dict['l1']
+    k1 = param_dict['k1']
+    l2 = param_dict['l2']
+    k2 = param_dict['k2']
+    cw = param_dict['cw']
+    cb = param_dict['cb']
+    K = param_dict['K']
+    a = param_dict['a']
+
+    e = [_indicator(n, (j,)) for j in range(4)]
+
+    # sex-ratio of the progeny g = tanh(k rho / 2) and its gradient, dg/drho = k / 2 (1 - g^2) (bounded for any rho)
+    g1, g2 = g_(rho1[0], k1), g_(rho2[0], k2)
+    grad_g1 = k1 / 2 * (1 - g1 ** 2) * rho1[1]
+    grad_g2 = k2 / 2 * (1 - g2 ** 2) * rho2[1]
+
+    # F1, M1, F2, M2
+    return np.array([
+        e[0] * (b * g1 - d - p * (1 - a * l1) / DF1[0] - (cw * n[0] + cb * n[2]) / K) + n[0] * b * grad_g1
+        + n[0] * p * (1 - a * l1) / DF1[0] ** 2 * DF1[1] - n[0] / K * (cw * e[0] + cb * e[2]),
+
+        e[0] * b * (1 - g1) - n[0] * b * grad_g1 - e[1] * (d + p / DM1[0]) + n[1] * p / DM1[0] ** 2 * DM1[1],
+
+        e[2] * (b * g2 - d - p * (1 - a * l2) / DF2[0] - (cw * n[2] + cb * n[0]) / K) + n[2] * b * grad_g2
+        + n[2] * p * (1 - a * l2) / DF2[0] ** 2 * DF2[1] - n[2] / K * (cw * e[2] + cb * e[0]),
+
+        e[2] * b * (1 - g2) - n[2] * b * grad_g2 - e[3] * (d + p / DM2[0]) + n[3] * p / DM2[0] ** 2 * DM2[1]
+    ], dtype='float64')
+
+
+def no_mimicry_jac(n, t, param_dict):
+    """
+    Jacobian matrix of no_mimicry, to be given as Dfun to odeint
+    :param n: array containing number of females and males [F1,M1,F2,M2]
+    :param t: time
+    :param param_dict: dictionary for all parameters
+    :return: array J[i, j] = d(dn_i/dt)/dn_j
+    """
+    rho1 = _proportion(n, (1,), (0, 1))
+    rho2 = _proportion(n, (3,), (2, 3))
+
+    l1 = param_dict['l1']
+    l2 = param_dict['l2']
+    B = param_dict['B']
+
+    e0, e2 = _indicator(n, (0,)), _indicator(n, (2,))
+    D1 = (1 + l1 * n[0] * (1 - B * rho1[0]), l1 * (1 - B * rho1[0]) * e0 - l1 * n[0] * B * rho1[1])
+    D2 = (1 + l2 * n[2] * (1 - B * rho2[0]), l2 * (1 - B * rho2[0]) * e2 - l2 * n[2] * B * rho2[1])
+
+    return _jacobian_rows(n, param_dict, rho1, rho2, D1, D1, D2, D2)
+
+
+def mimicry_jac(n, t, param_dict):
+    """
+    Jacobian matrix of mimicry, to be given as Dfun to odeint
+    :param n: array containing number of females and males [F1,M1,F2,M2]
+    :param t: time
+    :param param_dict: dictionary for all parameters
+    :return: array J[i, j] = d(dn_i/dt)/dn_j
+    """
+    rho1 = _proportion(n, (1,), (0, 1))
+    rho2 = _proportion(n, (3,), (2, 3))
+    rho3 = _proportion(n, (1, 3), (0, 1, 2, 3))
+
+    l1 = param_dict['l1']
+    l2 = param_dict['l2']
+    B = param_dict['B']
+
+    e0, e2 = _indicator(n, (0,)), _indicator(n, (2,))
+    L = l1 * n[0] + l2 * n[2]
+    D = (1 + L * (1 - B * rho3[0]), (1 - B * rho3[0]) * (l1 * e0 + l2 * e2) - L * B * rho3[1])
+
+    return _jacobian_rows(n, param_dict, rho1, rho2, D, D, D, D)
+
+
+def dslm_jac(n, t, param_dict):
+    """
+    Jacobian matrix of dslm, to be given as Dfun to odeint
+    :param n: array containing number of females and males [F1,M1,F2,M2]
+    :param t: time
+    :param param_dict: dictionary for all parameters
+    :return: array J[i, j] = d(dn_i/dt)/dn_j
+    """
+    rho1 = _proportion(n, (1,), (0, 1))
+    rho2 = _proportion(n, (3,), (2, 3))
+    rho3 = _proportion(n, (1, 3), (0, 1, 3))
+
+    l1 = param_dict['l1']
+    l2 = param_dict['l2']
+    B = param_dict['B']
+
+    e0, e2 = _indicator(n, (0,)), _indicator(n, (2,))
+    D1 = (1 + l1 * n[0] * (1 - B * rho3[0]), l1 * (1 - B * rho3[0]) * e0 - l1 * n[0] * B * rho3[1])
+    D2 = (1 + l2 * n[2], l2 * e2)
+
+    return _jacobian_rows(n, param_dict, rho1, rho2, D1, D1, D2, D1)
+
+
+# analytic Jacobian matrix of each differential equations system
+JACOBIANS = {no_mimicry: no_mimicry_jac,
+             mimicry: mimicry_jac,
+             dslm: dslm_jac}
+
+
+### compiled kernels
+# The systems above take a dictionary of parameters and allocate NumPy arrays at each call. The kernels below compute
+# the same equations from a flat parameter vector (see KERNEL_PARAMETERS) and are compiled by Numba when it is
+# installed, otherwise they run as plain Python on floats.
+KERNEL_PARAMETERS = ('b', 'd', 'p', 'l1', 'k1', 'l2', 'k2', 'cw', 'cb', 'K', 'a', 'B')
+
+try:
+    from numba import njit
+    NUMBA = True
+except ImportError:
+    NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda function: function
+
+
+@njit(cache=True)
+def _rhs_kernel(n, theta, model):
+    """
+    :param n: array containing number of females and males [F1,M1,F2,M2]
+    :param theta: parameter vector ordered as KERNEL_PARAMETERS
+    :param model: 0 for no_mimicry, 1 for mimicry, 2 for dslm
+    :return: dF1/dt, dM1/dt, dF2/dt, dM2/dt
+    """
+    b, d, p, l1, k1, l2, k2, cw, cb, K, a, B = (theta[0], theta[1], theta[2], theta[3], theta[4], theta[5],
+                                                 theta[6], theta[7], theta[8], theta[9], theta[10], theta[11])
+
+    rho1 = n[1] / (n[0] + n[1]) if (n[0] + n[1]) > 0 else 0.  # male proportion in the population for species 1
+    rho2 = n[3] / (n[2] + n[3]) if (n[2] + n[3]) > 0 else 0.  # male proportion in the population for species 2
+
+    # denominators of the predation terms of F1, M1, F2, M2
+    if model == 0:
+        DF1 = 1 + l1 * n[0] * (1 - B * rho1)
+        DF2 = 1 + l2 * n[2] * (1 - B * rho2)
+        DM1, DM2 = DF1, DF2
+    elif model == 1:
+        rho3 = (n[1] + n[3]) / (n[0] + n[1] + n[2] + n[3]) if (n[0] + n[1] + n[2] + n[3]) > 0 else 0.
+        DF1 = 1 + (l1 * n[0] + l2 * n[2]) * (1 - B * rho3)
+        DM1, DF2, DM2 = DF1, DF1, DF1
+    else:
+        rho3 = (n[1] + n[3]) / (n[1] + n[0] + n[3]) if (n[1] + n[0] + n[3]) > 0 else 0.
+        DF1 = 1 + l1 * n[0] * (1 - B * rho3)
+        DF2 = 1 + l2 * n[2]
+        DM1, DM2 = DF1, DF1
+
+    g1 = (1 - math.exp(-rho1 * k1)) / (1 + math.exp(-rho1 * k1))
+    g2 = (1 - math.exp(-rho2 * k2)) / (1 + math.exp(-rho2 * k2))
+
+    # F1, M1, F2, M2
+    out = np.empty(4)
+    out[0] = n[0] * b * g1 - d * n[0] - n[0] * p * (1 - a * l1) / DF1 - (cw * n[0] + cb * n[2]) * n[0] / K
+    out[1] = n[0] * b * (1 - g1) - d * n[1] - n[1] * p / DM1
+    out[2] = n[2] * b * g2 - d * n[2] - n[2] * p * (1 - a * l2) / DF2 - (cw * n[2] + cb * n[0]) * n[2] / K
+    out[3] = n[2] * b * (1 - g2) - d * n[3] - n[3] * p / DM2
+    return out
+
+
+@njit(cache=True)
+def no_mimicry_kernel(n, t, theta):
+    """
+    Kernel of no_mimicry taking the parameter vector theta ordered as KERNEL_PARAMETERS
+    """
+    return _rhs_kernel(n, theta, 0)
+
+
+@njit(cache=True)
+def mimicry_kernel(n, t, theta):
+    """
+    Kernel of mimicry taking the parameter vector theta ordered as KERNEL_PARAMETERS
+    """
+    return _rhs_kernel(n, theta, 1)
+
+
+@njit(cache=True)
+def dslm_kernel(n, t, theta):
+    """
+    Kernel of dslm taking the parameter vector theta ordered as KERNEL_PARAMETERS
+    """
+    return _rhs_kernel(n, theta, 2)
+
+
+# compiled kernel of each differential equations system
+KERNELS = {no_mimicry: no_mimicry_kernel,
+           mimicry: mimicry_kernel,
+           dslm: dslm_kernel}
+
+
+@njit(cache=True)
+def _proportion_kernel(n, num, den):
+    """
+    :param n: array containing number of females and males [F1,M1,F2,M2]
+    :param num: indicator array of the state variables summed at the numerator
+    :param den: indicator array of the state variables summed at the denominator
+    :return: proportion and its gradient with respect to n (see _proportion)
+    """
+    m = np.sum(n * num)
+    s = np.sum(n * den)
+    value = m / s if s > 0 else 0.
+    grad = (num - den * value) / s if s > PROPORTION_TINY else np.zeros(4)
+    return value, grad
+
+
+@njit(cache=True)
+def _jac_kernel(n, theta, model):
+    """
+    :param n: array containing number of females and males [F1,M1,F2,M2]
+    :param theta: parameter vector ordered as KERNEL_PARAMETERS
+    :param model: 0 for no_mimicry, 1 for mimicry, 2 for dslm
+    :return: array J[i, j] = d(dn_i/dt)/dn_j (see _jacobian_rows)
+    """
+    b, d, p, l1, k1, l2, k2, cw, cb, K, a, B = (theta[0], theta[1], theta[2], theta[3], theta[4], theta[5],
+                                                 theta[6], theta[7], theta[8], theta[9], theta[10], theta[11])
+    e = np.eye(4)
+
+    rho1, grad_rho1 = _proportion_kernel(n, e[1], e[0] + e[1])
+    rho2, grad_rho2 = _proportion_kernel(n, e[3], e[2] + e[3])
+
+    # denominators of the predation terms of F1, M1, F2, M2 and their gradients
+    if model == 0:
+        DF1 = 1 + l1 * n[0] * (1 - B * rho1)
+        grad_DF1 = l1 * (1 - B * rho1) * e[0] - l1 * n[0] * B * grad_rho1
+        DF2 = 1 + l2 * n[2] * (1 - B * rho2)
+        grad_DF2 = l2 * (1 - B * rho2) * e[2] - l2 * n[2] * B * grad_rho2
+        DM1, grad_DM1, DM2, grad_DM2 = DF1, grad_DF1, DF2, grad_DF2
+    elif model == 1:
+        rho3, grad_rho3 = _proportion_kernel(n, e[1] + e[3], e[0] + e[1] + e[2] + e[3])
+        L = l1 * n[0] + l2 * n[2]
+        DF1 = 1 + L * (1 - B * rho3)
+        grad_DF1 = (1 - B * rho3) * (l1 * e[0] + l2 * e[2]) - L * B * grad_rho3
+        DM1, grad_DM1, DF2, grad_DF2, DM2, grad_DM2 = DF1, grad_DF1, DF1, grad_DF1, DF1, grad_DF1
+    else:
+        rho3, grad_rho3 = _proportion_kernel(n, e[1] + e[3], e[0] + e[1] + e[3])
+        DF1 = 1 + l1 * n[0] * (1 - B * rho3)
+        grad_DF1 = l1 * (1 - B * rho3) * e[0] - l1 * n[0] * B * grad_rho3
+        DF2 = 1 + l2 * n[2]
+        grad_DF2 = l2 * e[2]
+        DM1, grad_DM1, DM2, grad_DM2 = DF1, grad_DF1, DF1, grad_DF1
+
+    # sex-ratio of the progeny g = tanh(k rho / 2) and its gradient
+    g1 = (1 - math.exp(-rho1 * k1)) / (1 + math.exp(-rho1 * k1))
+    g2 = (1 - math.exp(-rho2 * k2)) / (1 + math.exp(-rho2 * k2))
+    grad_g1 = k1 / 2 * (1 - g1 ** 2) * grad_rho1
+    grad_g2 = k2 / 2 * (1 - g2 ** 2) * grad_rho2
+
+    # F1, M1, F2, M2
+    out = np.empty((4, 4))
+    out[0] = (e[0] * (b * g1 - d - p * (1 - a * l1) / DF1 - (cw * n[0] + cb * n[2]) / K) + n[0] * b * grad_g1
+              + n[0] * p * (1 - a * l1) / DF1 ** 2 * grad_DF1 - n[0] / K * (cw * e[0] + cb * e[2]))
+    out[1] = e[0] * b * (1 - g1) - n[0] * b * grad_g1 - e[1] * (d + p / DM1) + n[1] * p / DM1 ** 2 * grad_DM1
+    out[2] = (e[2] * (b * g2 - d - p * (1 - a * l2) / DF2 - (cw * n[2] + cb * n[0]) / K) + n[2] * b * grad_g2
+              + n[2] * p * (1 - a * l2) / DF2 ** 2 * grad_DF2 - n[2] / K * (cw * e[2] + cb * e[0]))
+    out[3] = e[2] * b * (1 - g2) - n[2] * b * grad_g2 - e[3] * (d + p / DM2) + n[3] * p / DM2 ** 2 * grad_DM2
+    return out
+
+
+@njit(cache=True)
+def no_mimicry_jac_kernel(n, t, theta):
+    """
+    Kernel of no_mimicry_jac taking the parameter vector theta ordered as KERNEL_PARAMETERS
+    """
+    return _jac_kernel(n, theta, 0)
+
+
+@njit(cache=True)
+def mimicry_jac_kernel(n, t, theta):
+    """
+    Kernel of mimicry_jac taking the parameter vector theta ordered as KERNEL_PARAMETERS
+    """
+    return _jac_kernel(n, theta, 1)
+
+
+@njit(cache=True)
+def dslm_jac_kernel(n, t, theta):
+    """
+    Kernel of dslm_jac taking the parameter vector theta ordered as KERNEL_PARAMETERS
+    """
+    return _jac_kernel(n, theta, 2)
+
+
+# compiled Jacobian matrix of each differential equations system
+JACOBIAN_KERNELS = {no_mimicry: no_mimicry_jac_kernel,
+                    mimicry: mimicry_jac_kernel,
+                    dslm: dslm_jac_kernel}
+
+
+def parameter_vector(param_dict):
+    """
+    :param param_dict: dictionary for all parameters
+    :return: parameter vector theta ordered as KERNEL_PARAMETERS
+    """
+    return np.array([param_dict[name] for name in KERNEL_PARAMETERS], dtype='float64')
+
+
+def integrate(func, state, time, param_dict, counters=None):
+    """
+    odeint of a differential equations system, through its compiled kernel and analytic Jacobian matrix when known (the
+    Jacobian matrix being estimated by odeint when Numba is not installed)
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param state: initial state [F1,M1,F2,M2]
+    :param time: array of times at which the state is computed, the first one being the time of the initial state
+    :param param_dict: dictionary for all parameters
+    :param counters: dictionary to which the numbers of evaluations of the system ('nfev') and of its Jacobian matrix
+    ('njev') reported by odeint are added, None to skip the counting
+    :return: array of the states at each time
+    """
+    if func in KERNELS:
+        # the Jacobian matrix only pays off against the finite differences of odeint when it is compiled
+        rhs, args, jac = KERNELS[func], (parameter_vector(param_dict),), JACOBIAN_KERNELS[func] if NUMBA else None
+    else:
+        rhs, args, jac = func, (param_dict,), None
+
+    if counters is None:
+        return odeint(rhs, state, time, args=args, Dfun=jac)
+
+    sol, info = odeint(rhs, state, time, args=args, Dfun=jac, full_output=True)
+    counters['nfev'] += int(info['nfe'][-1])
+    counters['njev'] += int(info['nje'][-1])
+    return sol
+
+
+def low_density_growth(func, state, param_dict, species, eps=1e-9, points=101):
+    """
+    Asymptotic per-capita growth rate of a species at low density, the other species staying at its current state.
+    At low density the abundance N of the species grows at the rate h(rho) while its male proportion follows
+    drho/dt = q(rho), both computed numerically on a grid of rho between 0 and 1, so that N eventually grows at the
+    rate h(rho*) of a stable equilibrium rho* of q (the largest of these rates is returned).
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param state: array containing number of females and males [F1,M1,F2,M2]
+    :param param_dict: dictionary for all parameters
+    :param species: 0 for species 1, 1 for species 2
+    :param eps: abundance of the species at which the rates are computed
+    :param points: number of values of rho
+    :return: growth rate h(rho*)
+    """
+    rho = np.linspace(0, 1, points)
+    n = np.repeat(np.asarray(state, dtype='float64')[:, None], points, axis=1)
+    n[2 * species] = eps * (1 - rho)
+    n[2 * species + 1] = eps * rho
+
+    dn = func(n, 0, param_dict)
+    h = (dn[2 * species] + dn[2 * species + 1]) / eps
+    q = dn[2 * species + 1] / eps - rho * h
+
+    # stable equilibria of q: q goes from positive to non-positive (rho = 1 being an equilibrium of q)
+    crossing = np.flatnonzero((q[:-1] > 0) & (q[1:] <= 0))
+    if not len(crossing):
+        return np.max(h)
+    weight = q[crossing] / (q[crossing] - q[crossing + 1])
+    return np.max(h[crossing] + weight * (h[crossing + 1] - h[crossing]))
+
+
+def absorbing_states(func, state, param_dict, threshold=0.001):
+    """
+    Detect the species which cannot escape extinction anymore: their abundance is below the persistence threshold and
+    their low-density growth rate (see low_density_growth) is negative. These species are set to 0 and, when the
+    remaining species follows the same equations as in no_mimicry (species 2 extinct, or species 1 extinct outside
+    DSLM), the system is reduced to no_mimicry.
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param state: array containing number of females and males [F1,M1,F2,M2]
+    :param param_dict: dictionary for all parameters
+    :param threshold: persistence threshold on the abundance of a species
+    :return: function to use from now on, state with the extinct species set to 0, and the shortcut taken (None,
+    'sp1', 'sp2' for the extinction of one species or 'extinct' when no species remains)
+    """
+    abundances = [state[0] + state[1], state[2] + state[3]]
+    absorbed = [0 < abundances[i] < threshold and low_density_growth(func, state, param_dict, i) < 0 for i in (0, 1)]
+    if not any(absorbed):
+        return func, state, None
+
+    state = np.array(state, dtype='float64')
+    for i in (0, 1):
+        if absorbed[i]:
+            state[2 * i:2 * i + 2] = 0
+
+    if not np.any(state):
+        return func, state, 'extinct'
+    if absorbed[1] or func is not dslm:
+        return no_mimicry, state, 'sp{0}'.format(absorbed.index(True) + 1)
+    return func, state, 'sp1'
+
+
+def record_states(record, t, states):
+    """
+    Record the part of a trajectory falling between its first and last times
+    :param record: (times, out): increasing times at which the state is recorded and array of shape (len(times), 4)
+    receiving the states [F1,M1,F2,M2] at these times
+    :param t: times of the integrated states
+    :param states: array of the integrated states, of shape (len(t), 4), linearly interpolated at the recorded times
+    """
+    times, out = record
+    inside = (times >= t[0]) & (times <= t[-1])
+    for j in range(4):
+        out[inside, j] = np.interp(times[inside], t, states[:, j])
+
+
+def steady_state(func, cond_ini, param_dict, t_max=5050, window=10, eq_tol=0.0001 / 50, threshold=0.001,
+                 counters=None, record=None, chunk=50, max_chunk=800):
+    """
+    Integrate the system until it reaches an equilibrium, instead of restarting 50-time-unit integrations.
+    The system is integrated by chunks, each one a single odeint call sampled every window time units, whose length
+    doubles from chunk to max_chunk while the system has not settled. The integration stops at the first sample where
+    the state changed by less than eq_tol * window since the previous sample (steady state) or every species falls
+    below the persistence threshold (extinction, the state being then set to 0).
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param cond_ini: initial state [F1,M1,F2,M2]
+    :param param_dict: dictionary for all parameters
+    :param t_max: maximal integration time (same horizon as the 101 windows of the restart loop of solver)
+    :param window: time between two samples on which the stopping conditions are checked
+    :param eq_tol: threshold on the rate of change of the state (the 0.0001 tolerance of solver spread over a
+    50-time-unit window)
+    :param threshold: persistence threshold on the abundance of a species
+    :param counters: dictionary counting the evaluations of the system and of its Jacobian matrix (see integrate)
+    :param record: (times, out) receiving the trajectory (see record_states), interpolated between the samples and
+    equal to the final state after t_eq; None to record nothing
+    :param chunk: length of the first chunk
+    :param max_chunk: maximal length of a chunk
+    :return: final state [F1,M1,F2,M2], dictionary with the time to equilibrium 't_eq', the number of 50-time-unit
+    windows 'iterations' it corresponds to, 'converged', the 'event' which stopped the integration and the last
+    'shortcut' taken at time 't_shortcut' (see absorbing_states)
+    """
+    state = np.array(cond_ini, dtype='float64')
+    t_eq = 0
+    event = None
+    shortcut = t_shortcut = None
+
+    while True:
+        if event == 'steady':
+            break
+        elif max(state[0] + state[1], state[2] + state[3]) < threshold:
+            state = np.zeros(4)
+            event = 'extinct'
+            break
+        elif t_eq >= t_max:
+            break
+
+        samples = int(np.ceil(min(chunk, t_max - t_eq) / window))
+        times = t_eq + window * np.arange(samples + 1, dtype='float64')
+        sol = integrate(func, state, times, param_dict, counters)
+
+        # first sample at which the system is at equilibrium, extinct or has a species below the threshold
+        abundances = np.array([sol[:, 0] + sol[:, 1], sol[:, 2] + sol[:, 3]])
+        steady = np.max(np.abs(np.diff(sol, axis=0)), axis=1) < eq_tol * window
+        settled = steady | (abundances[:, 1:].max(axis=0) < threshold)
+        low = np.any((abundances > 0) & (abundances < threshold), axis=0)
+        stop = np.flatnonzero(settled)
+        last = stop[0] + 1 if stop.size else samples
+
+        fired = None
+        for i in np.flatnonzero(low[1:last])[:1] + 1:
+            absorbed = absorbing_states(func, sol[i], param_dict, threshold)
+            if absorbed[2] is not None:
+                last = i
+                func, state, fired = absorbed
+
+        if record is not None:
+            record_states(record, times[:last + 1], sol[:last + 1])
+        t_eq = times[last]
+        if fired is None:
+            func, state, fired = absorbing_states(func, sol[last], param_dict, threshold)
+            event = 'steady' if steady[last - 1] and fired is None else None
+        if fired is not None:
+            shortcut, t_shortcut = fired, t_eq
+        chunk = min(2 * chunk, max_chunk)
+
+    if record is not None:
+        record[1][record[0] > t_eq] = state
+
+    info = {'t_eq': t_eq,
+            'iterations': max(int(np.ceil(t_eq / 50)) - 1, 0),
+            'converged': event is not None,
+            'event': event,
+            'shortcut': shortcut,
+            't_shortcut': t_shortcut}
+
+    return state, info
+
+
+def solver(func, AB, SR, ab, sr, b, d, p, l1, k1, l2, k2, cw, cb, K, a, B, steady=False, full_output=False,
+           init=None, record=None):
     """
     :param func: function to use (no_mimicry, mimicry or dslm)
     :param AB: total initial abundance of the species 1 population (F1+M1)
@@ -155,12 +690,28 @@ def solver(func, AB, SR, ab, sr, b, d, p, l1, k1, l2, k2, cw, cb, K, a, B):
     :param K: carrying capacity link to resources
     :param a: intensity of direct avantage to females due to their painful sting
     :param B: intensity of male cost on protection brought by Müllerian mimicry
+    :param steady: if True, integrate once until equilibrium or extinction (see steady_state) instead of restarting
+    50-time-unit integrations
+    :param full_output: if True, also return a dictionary with the time to equilibrium 't_eq', the number of restart
+    'iterations', whether the system 'converged' (False when stopped by the limit of 100 restarts), the last
+    'shortcut' taken at time 't_shortcut' when a species went extinct (see absorbing_states), the numbers of
+    evaluations of the system 'nfev' and of its Jacobian matrix 'njev', and the 'wall_time' of the call (seconds)
+    :param init: initial state [F1,M1,F2,M2] used instead of the one given by AB, SR, ab and sr (e.g. the equilibrium
+    of a neighbouring parameter set, see Dataframe_Generator.run_batch)
+    :param record: (times, out): increasing times and array of shape (len(times), 4) receiving the trajectory
+    [F1,M1,F2,M2] at these times (see record_states), the final state being repeated after the end of the integration;
+    None to record nothing (see Trajectories)
     :return: [persistence of sp1 (0/1), persistence of sp2 (0/1), coexistence (0/1), F1, M1, F2, M2]
     """
     TIME_INT = np.linspace(0, 50, 500)
+    start = perf_counter()
+    counters = {'nfev': 0, 'njev': 0} if full_output else None
 
-    cond_ini = np.array([AB * (1 - SR), AB * SR,
-                         ab * (1 - sr), ab * sr], dtype='float64')
+    if init is None:
+        cond_ini = np.array([AB * (1 - SR), AB * SR,
+                             ab * (1 - sr), ab * sr], dtype='float64')
+    else:
+        cond_ini = np.array(init, dtype='float64')
 
     first_state = cond_ini
     iteration = 0
@@ -179,23 +730,43 @@ def solver(func, AB, SR, ab, sr, b, d, p, l1, k1, l2, k2, cw, cb, K, a, B):
                   'a': a,
                   'B': B}
 
-    while exit == 0:
-        sol = odeint(func, first_state, TIME_INT, args=(param_list,))
-        second_state = sol[-1, :]
-        if iteration == 100:
-            break
-        elif np.any(np.abs(second_state - first_state) > 0.0001):
-            first_state = second_state
-            iteration += 1
-        else:
-            exit = 1
+    if steady:
+        final_state, info = steady_state(func, cond_ini, param_list, counters=counters, record=record)
+    else:
+        shortcut = t_shortcut = None
+        while exit == 0:
+            sol = integrate(func, first_state, TIME_INT, param_list, counters)
+            if record is not None:
+                record_states(record, TIME_INT + TIME_INT[-1] * iteration, sol)
+            # extinct species are removed, and the integration stops when no species remains
+            func, second_state, fired = absorbing_states(func, sol[-1, :], param_list)
+            if fired is not None:
+                shortcut, t_shortcut = fired, TIME_INT[-1] * (iteration + 1)
+            if fired == 'extinct':
+                exit = 1
+            elif iteration == 100:
+                break
+            elif np.any(np.abs(second_state - first_state) > 0.0001):
+                first_state = second_state
+                iteration += 1
+            else:
+                exit = 1
 
-    if (sol[-1, 1] + sol[-1, 0]) > 0.001:
+        final_state = second_state
+        if record is not None:
+            record[1][record[0] > TIME_INT[-1] * (iteration + 1)] = final_state
+        info = {'t_eq': TIME_INT[-1] * (iteration + 1),
+                'iterations': iteration,
+                'converged': exit == 1,
+                'shortcut': shortcut,
+                't_shortcut': t_shortcut}
+
+    if (final_state[1] + final_state[0]) > 0.001:
         eq_sp1 = 1
     else:
         eq_sp1 = 0
 
-    if (sol[-1, 3] + sol[-1, 2]) > 0.001:
+    if (final_state[3] + final_state[2]) > 0.001:
         eq_sp2 = 1
     else:
         eq_sp2 = 0
@@ -205,7 +776,340 @@ def solver(func, AB, SR, ab, sr, b, d, p, l1, k1, l2, k2, cw, cb, K, a, B):
     else:
         coexistence = 0
 
-    return [eq_sp1, eq_sp2, coexistence, sol[-1, 0], sol[-1, 1], sol[-1, 2], sol[-1, 3]]
+    result = [eq_sp1, eq_sp2, coexistence, final_state[0], final_state[1], final_state[2], final_state[3]]
+
+    if full_output:
+        info.update(counters, wall_time=perf_counter() - start)
+        return result, info
+    return result
+
+
+def jacobian(func, n, param_dict, analytic=True, eps=1e-6):
+    """
+    Jacobian matrix of a differential equations system, analytic for no_mimicry, mimicry and dslm (compiled when Numba
+    is installed) or estimated by central finite differences
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param n: array containing number of females and males [F1,M1,F2,M2]
+    :param param_dict: dictionary for all parameters
+    :param analytic: False to use finite differences even if the analytic Jacobian matrix is known
+    :param eps: relative step of the finite differences
+    :return: 4x4 array J[i, j] = d(dn_i/dt)/dn_j
+    """
+    n = np.asarray(n, dtype='float64')
+    if analytic and NUMBA and func in JACOBIAN_KERNELS:
+        return JACOBIAN_KERNELS[func](n, 0, parameter_vector(param_dict))
+    if analytic and func in JACOBIANS:
+        return JACOBIANS[func](n, 0, param_dict)
+
+    jac = np.zeros((4, 4))
+    for j in range(4):
+        h = eps * max(abs(n[j]), 1)
+        dn = np.zeros(4)
+        dn[j] = h
+        jac[:, j] = (func(n + dn, 0, param_dict) - func(n - dn, 0, param_dict)) / (2 * h)
+    return jac
+
+
+def equilibrium_solver(func, AB, SR, ab, sr, b, d, p, l1, k1, l2, k2, cw, cb, K, a, B, warm_up=50,
+                       full_output=False, init=None, rtol=0.001, maxfev=50):
+    """
+    Alternative engine to solver finding directly the equilibrium reached by the system: after a short integration
+    from the initial condition, the fixed point of the system is searched with a hybrid Newton root finder and
+    classified by the eigenvalues of its Jacobian matrix (see jacobian).
+    The root is kept if it is non-negative and stable, if a short integration from the root stays on it, and if the
+    trajectory gets closer to it during a second warm-up; otherwise the integration goes on from the end of the
+    warm-ups with solver in steady-state mode.
+    Parameters are the same as solver.
+    :param warm_up: integration time before the root finding, and of the checks of the root
+    :param full_output: if True, also return a dictionary with the 'method' used ('root' or 'integration'), the
+    'eigenvalues' of the Jacobian matrix at the root, and the diagnostics of solver ('iterations', 'converged',
+    'nfev', 'njev' and 'wall_time', the evaluations of the root finder being counted in nfev and njev)
+    :param init: initial state [F1,M1,F2,M2] used instead of the one given by AB, SR, ab and sr
+    :param rtol: relative distance to the root allowed at the end of the integration from the root
+    :param maxfev: maximal number of evaluations of the system by the root finder
+    :return: [persistence of sp1 (0/1), persistence of sp2 (0/1), coexistence (0/1), F1, M1, F2, M2]
+    """
+    start = perf_counter()
+    counters = {'nfev': 0, 'njev': 0} if full_output else None
+    WARM_UP = np.array([0, warm_up], dtype='float64')
+
+    if init is None:
+        cond_ini = np.array([AB * (1 - SR), AB * SR,
+                             ab * (1 - sr), ab * sr], dtype='float64')
+    else:
+        cond_ini = np.array(init, dtype='float64')
+
+    param_list = {'b': b,
+                  'd': d,
+                  'p': p,
+                  'l1': l1,
+                  'k1': k1,
+                  'l2': l2,
+                  'k2': k2,
+                  'cw': cw,
+                  'cb': cb,
+                  'K': K,
+                  'a': a,
+                  'B': B}
+
+    state = integrate(func, cond_ini, WARM_UP, param_list, counters)[-1, :]
+    t_warm = warm_up
+
+    # species absent from the start stay absent, the others must not be extinct yet
+    present = np.array([cond_ini[0] + cond_ini[1] > 0, cond_ini[2] + cond_ini[3] > 0])
+    abundances = np.array([state[0] + state[1], state[2] + state[3]])
+    eigenvalues = None
+
+    if np.any(present) and np.all(abundances[present] > 0.001):
+        # absent species are removed from the system solved
+        mask = np.repeat(present, 2)
+        fixed_point = np.zeros(4)
+        if func in KERNELS:
+            rhs, args = KERNELS[func], parameter_vector(param_list)
+        else:
+            rhs, args = func, param_list
+
+        def reduced_func(x):
+            fixed_point[mask] = x
+            return rhs(fixed_point, 0, args)[mask]
+
+        def reduced_jac(x):
+            fixed_point[mask] = x
+            return jacobian(func, fixed_point, param_list)[np.ix_(mask, mask)]
+
+        sol = root(reduced_func, state[mask], jac=reduced_jac, method='hybr', options={'maxfev': maxfev})
+        fixed_point[mask] = sol.x
+        if full_output:
+            counters['nfev'] += sol.nfev
+            counters['njev'] += sol.get('njev', 0)
+
+        if sol.success and np.all(fixed_point >= 0):
+            eigenvalues = np.linalg.eigvals(reduced_jac(sol.x))
+
+            if np.all(eigenvalues.real < 0):
+                # the root is an equilibrium the trajectory is heading to (the integration goes on from the second
+                # warm-up otherwise)
+                stays = integrate(func, fixed_point, WARM_UP, param_list, counters)[-1, :]
+                previous, state = state, integrate(func, state, WARM_UP, param_list, counters)[-1, :]
+                t_warm += warm_up
+
+                tolerance = rtol * (np.abs(fixed_point) + 1)
+                if np.all(np.abs(stays - fixed_point) <= tolerance) and (
+                        np.all(np.abs(state - fixed_point) <= tolerance)
+                        or np.linalg.norm(state - fixed_point) < np.linalg.norm(previous - fixed_point)):
+                    final_state = fixed_point
+                    eq_sp1 = int((final_state[1] + final_state[0]) > 0.001)
+                    eq_sp2 = int((final_state[3] + final_state[2]) > 0.001)
+                    result = [eq_sp1, eq_sp2, eq_sp1 * eq_sp2,
+                              final_state[0], final_state[1], final_state[2], final_state[3]]
+
+                    if full_output:
+                        return result, dict(counters, method='root', eigenvalues=eigenvalues, iterations=0,
+                                            converged=True, wall_time=perf_counter() - start)
+                    return result
+
+    if not full_output:
+        return solver(func, AB, SR, ab, sr, b, d, p, l1, k1, l2, k2, cw, cb, K, a, B, steady=True, init=state)
+
+    result, info = solver(func, AB, SR, ab, sr, b, d, p, l1, k1, l2, k2, cw, cb, K, a, B, steady=True,
+                          full_output=True, init=state)
+    info.update(method='integration', eigenvalues=eigenvalues, nfev=info['nfev'] + counters['nfev'],
+                njev=info['njev'] + counters['njev'], t_eq=info['t_eq'] + t_warm, wall_time=perf_counter() - start)
+    return result, info
+
+
+PARAMETER_NAMES = ('AB', 'SR', 'ab', 'sr', 'b', 'd', 'p', 'l1', 'k1', 'l2', 'k2', 'cw', 'cb', 'K', 'a', 'B')
+
+# Dormand-Prince 5(4) coefficients
+DP_C = (0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1, 1)
+DP_A = ((),
+        (1 / 5,),
+        (3 / 40, 9 / 40),
+        (44 / 45, -56 / 15, 32 / 9),
+        (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+        (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+        (35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84))
+DP_E = (71 / 57600, 0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+
+def dopri5(func, y, t_end, param_dict, rtol=1e-6, atol=1e-8, h0=0.01):
+    """
+    Vectorized adaptive Runge-Kutta (Dormand-Prince 5(4)) integration of a batch of autonomous systems, each column
+    having its own step size.
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param y: array of shape (4, N) containing the initial states [F1,M1,F2,M2] of the N systems
+    :param t_end: integration time
+    :param param_dict: dictionary for all parameters, each value being an array of length N
+    :param rtol: relative tolerance
+    :param atol: absolute tolerance
+    :param h0: initial step size
+    :return: array of shape (4, N) containing the states at t_end
+    """
+    y = np.array(y, dtype='float64')
+    t = np.zeros(y.shape[1])
+    h = np.full(y.shape[1], h0)
+    f = func(y, 0, param_dict)
+
+    while True:
+        idx = np.flatnonzero(t < t_end)
+        if idx.size == 0:
+            break
+
+        params = {key: value[idx] for key, value in param_dict.items()}
+        y_i = y[:, idx]
+        h_i = np.minimum(h[idx], t_end - t[idx])
+
+        k = [f[:, idx]]
+        for s in range(1, 7):
+            y_s = y_i + h_i * sum(coef * k_j for coef, k_j in zip(DP_A[s], k) if coef != 0)
+            k.append(func(y_s, 0, params))
+        y_new = y_s  # 7th stage is evaluated at the 5th order solution (FSAL)
+
+        scale = atol + rtol * np.maximum(np.abs(y_i), np.abs(y_new))
+        err = h_i * sum(coef * k_j for coef, k_j in zip(DP_E, k) if coef != 0) / scale
+        err = np.sqrt(np.mean(err ** 2, axis=0))
+        err[~np.isfinite(err)] = np.inf  # a step leading to an undefined state is rejected
+
+        accept = err <= 1
+        acc = idx[accept]
+        y[:, acc] = y_new[:, accept]
+        f[:, acc] = k[6][:, accept]
+        t[acc] += h_i[accept]
+
+        with np.errstate(divide='ignore'):
+            factor = np.clip(0.9 * err ** -0.2, 0.2, 5)
+        h[idx] = h_i * factor
+
+    return y
+
+
+def rosenbrock23(func, jac, y, t_end, param_dict, rtol=1e-6, atol=1e-8, h0=0.01):
+    """
+    Vectorized adaptive Rosenbrock (Shampine's ode23s) integration of a batch of autonomous stiff systems, each column
+    having its own step size. The 4x4 linear systems of all the columns are solved at once.
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param jac: Jacobian matrix of func (no_mimicry_jac, mimicry_jac or dslm_jac)
+    :param y: array of shape (4, N) containing the initial states [F1,M1,F2,M2] of the N systems
+    :param t_end: integration time
+    :param param_dict: dictionary for all parameters, each value being an array of length N
+    :param rtol: relative tolerance
+    :param atol: absolute tolerance
+    :param h0: initial step size
+    :return: array of shape (4, N) containing the states at t_end
+    """
+    D = 1 / (2 + np.sqrt(2))
+    E32 = 6 + np.sqrt(2)
+
+    y = np.array(y, dtype='float64')
+    t = np.zeros(y.shape[1])
+    h = np.full(y.shape[1], h0)
+
+    while True:
+        idx = np.flatnonzero(t < t_end)
+        if idx.size == 0:
+            break
+
+        params = {key: value[idx] for key, value in param_dict.items()}
+        y_i = y[:, idx]
+        h_i = np.minimum(h[idx], t_end - t[idx])
+
+        # W = I - h d J for every column, shape (N, 4, 4)
+        W_inv = np.linalg.inv(np.eye(4) - (h_i * D)[:, None, None] * np.moveaxis(jac(y_i, 0, params), -1, 0))
+
+        def solve(rhs):
+            return np.einsum('nij,jn->in', W_inv, rhs)
+
+        f0 = func(y_i, 0, params)
+        k1 = solve(f0)
+        f1 = func(y_i + 0.5 * h_i * k1, 0, params)
+        k2 = solve(f1 - k1) + k1
+        y_new = y_i + h_i * k2
+        f2 = func(y_new, 0, params)
+        k3 = solve(f2 - E32 * (k2 - f1) - 2 * (k1 - f0))
+
+        scale = atol + rtol * np.maximum(np.abs(y_i), np.abs(y_new))
+        err = np.sqrt(np.mean((h_i / 6 * (k1 - 2 * k2 + k3) / scale) ** 2, axis=0))
+        err[~np.isfinite(err)] = np.inf  # a step leading to an undefined state is rejected
+
+        accept = err <= 1
+        acc = idx[accept]
+        y[:, acc] = y_new[:, accept]
+        t[acc] += h_i[accept]
+
+        with np.errstate(divide='ignore'):
+            factor = np.clip(0.9 * err ** (-1 / 3), 0.2, 5)
+        h[idx] = h_i * factor
+
+    return y
+
+
+def solve_ensemble(func, params_array, rtol=1e-6, atol=1e-8, stiff=False, init=None):
+    """
+    Batched counterpart of solver: the N parameter sets are stacked into a (4, N) state and integrated together
+    with dopri5 (or rosenbrock23 for stiff systems), using the same restart loop, convergence criterion and removal of
+    the extinct species (see absorbing_states) as solver for every row.
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param params_array: array of shape (N, 16), each row being (AB,SR,ab,sr,b,d,p,l1,k1,l2,k2,cw,cb,K,a,B) as in
+    solver
+    :param rtol: relative tolerance of the integrator
+    :param atol: absolute tolerance of the integrator
+    :param stiff: if True, integrate with rosenbrock23 using the analytic Jacobian matrix of func
+    :param init: array of shape (N, 4) of the initial states [F1,M1,F2,M2] used instead of the ones given by AB, SR, ab
+    and sr
+    :return: array of shape (N, 7), each row being
+    [persistence of sp1 (0/1), persistence of sp2 (0/1), coexistence (0/1), F1, M1, F2, M2]
+    """
+    params_array = np.atleast_2d(np.asarray(params_array, dtype='float64'))
+    AB, SR, ab, sr = params_array[:, :4].T
+
+    if init is None:
+        state = np.array([AB * (1 - SR), AB * SR,
+                          ab * (1 - sr), ab * sr], dtype='float64')
+    else:
+        state = np.array(init, dtype='float64').reshape(-1, 4).T
+
+    param_dict = {name: params_array[:, i] for i, name in enumerate(PARAMETER_NAMES) if i >= 4}
+
+    active = np.arange(len(params_array))
+    for iteration in range(101):
+        params = {key: value[active] for key, value in param_dict.items()}
+        first_state = state[:, active]
+        if stiff:
+            second_state = rosenbrock23(func, JACOBIANS[func], first_state, 50, params, rtol=rtol, atol=atol)
+        else:
+            second_state = dopri5(func, first_state, 50, params, rtol=rtol, atol=atol)
+
+        # extinct species are removed, and the rows in which no species remains stop
+        abundances = np.array([second_state[0] + second_state[1], second_state[2] + second_state[3]])
+        extinct = np.zeros(active.size, dtype=bool)
+        for j in np.flatnonzero(np.any((abundances > 0) & (abundances < 0.001), axis=0)):
+            row = {key: value[j] for key, value in params.items()}
+            second_state[:, j], fired = absorbing_states(func, second_state[:, j], row)[1:]
+            extinct[j] = fired == 'extinct'
+
+        state[:, active] = second_state
+        if iteration == 100:
+            break
+        active = active[np.any(np.abs(second_state - first_state) > 0.0001, axis=0) & ~extinct]
+        if active.size == 0:
+            break
+
+    eq_sp1 = (state[1] + state[0]) > 0.001
+    eq_sp2 = (state[3] + state[2]) > 0.001
+    coexistence = eq_sp1 & eq_sp2
+
+    return np.column_stack([eq_sp1, eq_sp2, coexistence, state.T]).astype('float64')
+
+
+def ensemble_solver(func, *params, init=None):
+    """
+    Engine with the signature of solver solving one parameter set with solve_ensemble (whole chunks of parameter sets
+    being solved at once by Dataframe_Generator.run_engine)
+    Parameters are the same as solver.
+    :param init: initial state [F1,M1,F2,M2] used instead of the one given by AB, SR, ab and sr
+    :return: [persistence of sp1 (0/1), persistence of sp2 (0/1), coexistence (0/1), F1, M1, F2, M2]
+    """
+    return list(solve_ensemble(func, [params], init=None if init is None else [init])[0])
 
 
 if __name__ == '__main__':
@@ -214,3 +1118,5 @@ if __name__ == '__main__':
     print(solver(no_mimicry, 1000, 0.5, 1000, 0.5, 1, 0.2, 0.3, 0.05, 3, 0, 3, 1, 0.3, 1000, 5, 0.8))  # no mimicry
     print(solver(mimicry, 1000, 0.5, 1000, 0.5, 1, 0.2, 0.3, 0.05, 3, 0, 3, 1, 0.3, 1000, 5, 0.8))  # mimicry
     print(solver(dslm, 1000, 0.5, 1000, 0.5, 1, 0.2, 0.3, 0.05, 3, 0, 3, 1, 0.3, 1000, 5, 0.8))  # mimicry with DSLM
+    print(solve_ensemble(mimicry, [(1000, 0.5, 1000, 0.5, 1, 0.2, 0.3, 0.05, 3, 0, 3, 1, 0.3, 1000, a, 0.8)
+                                   for a in [0, 5, 10]]))  # batch of three parameter sets
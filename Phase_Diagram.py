@@ -0,0 +1,203 @@
+"""
+Phase diagrams of the state of the community of two species, shared by Fig3 (no mimicry), Fig4 (mimicry) and Fig5
+(dslm).
+The data of the panels of a model are summarized and interpolated once (see Aggregation). The models are processed in
+one pass by phase_maps, the grid and the triangulation of the cells being shared by the models swept on the same cells:
+    python Phase_Diagram.py                     # prepare the phase maps of the three models
+"""
+
+### libraries
+import os
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.gridspec import GridSpec
+
+from Aggregation import load_summary, interpolate
+
+# dataset of the (l2 - l1, k2 - k1) sweep of each model, the datasets of the (l1, l2) and (k1, k2) sweeps being named
+# with the suffixes '_l1l2' and '_k1k2'
+DATASETS = {'no_mimicry': 'df_two_no_mimicry', 'mimicry': 'df_two_mimicry', 'dslm': 'df_two_dslm'}
+
+# channels of a phase map: frequency of each modal state of the community (see Aggregation.STATES) and of the mode
+COLORS = {'blue': '00', 'purple': '10', 'yellow': '01', 'orange': '11'}
+CHANNELS = ('blue', 'orange', 'purple', 'yellow', 'freq')
+
+EXTENT = [-0.04, 0.04, -4, 4]
+
+LEVELS = [0, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.35, 0.4, 0.45, 0.5, 0.55, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95,
+          1, 1.01]
+
+### Colormaps
+cmap_blue = mpl.colors.LinearSegmentedColormap.from_list("", ["white", "#0C06F3"])
+cmap_orange = mpl.colors.LinearSegmentedColormap.from_list("", ["white", "#F3891D"])
+cmap_purple = mpl.colors.LinearSegmentedColormap.from_list("", ["white", "#690696"])
+cmap_yellow = mpl.colors.LinearSegmentedColormap.from_list("", ["white", "#96897A"])
+
+cmap_white = mpl.colors.LinearSegmentedColormap.from_list("", ['white', 'white'])
+cmap_tot = mpl.colors.ListedColormap(["#0C06F3", "#690696", "#96897A", "#F3891D"])
+
+cmap_sp1 = mpl.colors.LinearSegmentedColormap.from_list("", ["blue", "red"])
+cmap_sp2 = mpl.colors.LinearSegmentedColormap.from_list("", ["blue", "yellow"])
+
+cmap_sp1.set_under(color="black")
+cmap_sp2.set_under(color="black")
+
+
+def phase_summary(model, folder='./data'):
+    """
+    :param model: 'no_mimicry', 'mimicry' or 'dslm'
+    :param folder: folder of the datasets
+    :return: summary of the (l2 - l1, k2 - k1) sweep of the model by cell 'l_diff', 'k_diff', with the modal state of
+    the community, its frequency 'freq' and one indicator column per state (see COLORS)
+    """
+    df = load_summary(DATASETS[model], by=['l_diff', 'k_diff'], modal=True,
+                      derived={'l_diff': 'l2 - l1', 'k_diff': 'k2 - k1'}, folder=folder)
+    for color, state in COLORS.items():
+        df[color] = (df['mode'] == state).astype(int)
+    return df
+
+
+def phase_maps(models=tuple(DATASETS), extent=EXTENT, shape=(100, 100), folder='./data'):
+    """
+    :param models: models among 'no_mimicry', 'mimicry' and 'dslm'
+    :param extent: [xmin, xmax, ymin, ymax] of the grid
+    :param shape: numbers of points of the grid along y and x
+    :param folder: folder of the datasets
+    :return: xi, yi coordinates of the grid and {model: {channel: raster}} of the channels (see CHANNELS) clipped to
+    [0, 1], 'freq' being rescaled so that the cells without clear mode (frequency below 0.25) are white
+    """
+    xi, yi = np.meshgrid(np.linspace(extent[0], extent[1], shape[1]), np.linspace(extent[2], extent[3], shape[0]))
+    summaries = {model: phase_summary(model, folder) for model in models}
+
+    # one triangulation per set of cells, shared by the models swept on the same cells and built only if their rasters
+    # are not cached
+    triangulations = {}
+    maps = {}
+    for model, df in summaries.items():
+        rasters = interpolate(df, 'l_diff', 'k_diff', CHANNELS, extent, shape,
+                              cache=os.path.join(folder, DATASETS[model]), triangulations=triangulations)[2]
+        rasters = np.clip(rasters, 0, 1)
+        rasters[-1] = np.maximum(10 * (rasters[-1] - 0.25) / 7.5, 0)
+        maps[model] = dict(zip(CHANNELS, rasters))
+
+    return xi, yi, maps
+
+
+def plot_phase_map(ax, xi, yi, maps, extent=EXTENT, alpha=0.7):
+    """
+    Plot a phase map (see phase_maps): frequency of each modal state and its 0.75 contour, whitened where no state is
+    clearly modal
+    :param ax: axes
+    :param xi, yi: coordinates of the grid
+    :param maps: {channel: raster} of a model
+    :param extent: [xmin, xmax, ymin, ymax] of the grid
+    :param alpha: transparency of the contours
+    """
+    cmaps = {'orange': cmap_orange, 'blue': cmap_blue, 'purple': cmap_purple, 'yellow': cmap_yellow}
+    colors = {'orange': "#F3891D", 'blue': "#0C06F3", 'purple': "#690696", 'yellow': "#96897A"}
+
+    for channel in cmaps:
+        cs = ax.contour(xi, yi, maps[channel], levels=[0.75], colors=colors[channel], linewidths=3, alpha=alpha,
+                        linestyles=['dashed'])
+        ax.clabel(cs, fontsize=15, inline_spacing=0.2)
+
+    for channel, cmap in cmaps.items():
+        ax.imshow(maps[channel], vmin=0, vmax=1, origin='lower', extent=extent, aspect=0.01, cmap=cmap,
+                  alpha=maps[channel])
+    ax.imshow(maps['freq'], vmin=0, vmax=1, origin='lower', extent=extent, aspect=0.01, cmap=cmap_white,
+              alpha=1 - maps['freq'])
+
+
+def plot_persistence(ax, df, x, y):
+    """
+    Plot the frequencies of persistence of both species over the (x, y) sweep and their 0.5 contours
+    :param ax: axes
+    :param df: summary by cell (x, y) with the columns 'av_eq_sp1' and 'av_eq_sp2'
+    :param x, y: parameters of the sweep (e.g. 'l1', 'l2')
+    """
+    aspect = df[x].unique()[-1] / df[y].unique()[-1]
+    ax.set_aspect(aspect)
+
+    ax.set_facecolor(color='black')
+
+    ax.tricontourf(df[x], df[y], df['av_eq_sp1'], levels=LEVELS, cmap=cmap_sp1,
+                   vmin=0, vmax=1, alpha=1, antialiased=True)
+
+    ax.tricontourf(df[x], df[y], df['av_eq_sp2'], levels=LEVELS, cmap=cmap_sp2,
+                   vmin=0, vmax=1, alpha=0.6, antialiased=True)
+
+    cs1 = ax.tricontour(df[x], df[y], df['av_eq_sp1'], levels=[0.5], colors=['black'],
+                        linestyles=[(0, (5, 10))], vmin=0, vmax=1, alpha=1, antialiased=False, linewidths=2)
+
+    cs2 = ax.tricontour(df[x], df[y], df['av_eq_sp2'], levels=[0.5], colors=['white'],
+                        linestyles=[(0, (1, 10))], vmin=0, vmax=1, alpha=1, antialiased=False, linewidths=2)
+
+    ax.clabel(cs1, fontsize=15, inline_spacing=0.2)
+    ax.clabel(cs2, fontsize=15, inline_spacing=0.2)
+
+
+def two_species_figure(model, folder='./data'):
+    """
+    Figure of the state of the community of two species (Fig3 and Fig4): (a) phase map over l2 - l1 and k2 - k1, and
+    persistence of both species over (b) l1 and l2 and (c) k1 and k2
+    :param model: 'no_mimicry' or 'mimicry'
+    :param folder: folder of the datasets
+    :return: figure
+    """
+    ### Set the figure
+    fig = plt.figure(figsize=(10, 5))
+    fig.subplots_adjust(top=0.94,
+                        bottom=0.085,
+                        left=0.04,
+                        right=0.95)
+
+    gs = GridSpec(nrows=2, ncols=2, wspace=-0.2, hspace=0.3)
+    ax0 = fig.add_subplot(gs[:, 0])
+    ax1 = fig.add_subplot(gs[0, 1])
+    ax2 = fig.add_subplot(gs[1, 1])
+
+    ax0.set_title('(a)', fontsize=15, fontweight='bold')
+    ax1.set_title('(b)', fontsize=15, fontweight='bold')
+    ax2.set_title('(c)', fontsize=15, fontweight='bold')
+
+    ax0.set_xlabel(r"Relative female noxiousness: $\lambda_2$-$\lambda_1$", y=0, fontsize=20, weight='bold')
+    ax0.set_ylabel(r"Relative investment in son production: $h_2$-$h_1$", fontsize=20, fontweight='bold')
+    ax0.tick_params(axis='both', which='major', labelsize=15)
+
+    ax1.set_xlabel(r'Defence level $\lambda_1$', fontsize=17, fontweight='bold')
+    ax1.set_ylabel(r'Defence level $\lambda_2$', fontsize=17, fontweight='bold')
+    ax1.tick_params(axis='both', which='major', labelsize=15)
+
+    ax2.set_xlabel(r'Investment in sons $h_1$', fontsize=17, fontweight='bold')
+    ax2.set_ylabel(r'Investment in sons $h_2$', fontsize=17, fontweight='bold')
+    ax2.tick_params(axis='both', which='major', labelsize=15)
+
+    ### Set the colorbar
+    norm = mpl.colors.Normalize(vmin=0, vmax=1)
+    cbar_ax_1 = fig.add_axes([0.89, 0.10, 0.02, 0.77])
+    cb1 = mpl.colorbar.ColorbarBase(cbar_ax_1, cmap=cmap_tot, norm=norm, orientation='vertical',
+                                    ticks=[0.125, 0.375, 0.625, 0.875])
+    cb1.ax.set_yticklabels(['Coextinction', 'Only species 1', 'Only species 2', 'Coexistence'], fontsize=13.5)
+
+    cb1.ax.set_title('State of the community\nat equilibrium', fontsize=15, fontweight='bold')
+
+    ### (a) - Phase map
+    xi, yi, maps = phase_maps([model], folder=folder)
+    plot_phase_map(ax0, xi, yi, maps[model])
+
+    ### (b) and (c) - Persistence of both species
+    for ax, (x, y) in [(ax1, ('l1', 'l2')), (ax2, ('k1', 'k2'))]:
+        df = load_summary('{0}_{1}{2}'.format(DATASETS[model], x, y), by=[x, y], means=['eq_sp1', 'eq_sp2'],
+                          folder=folder)
+        plot_persistence(ax, df, x, y)
+
+    return fig
+
+
+if __name__ == '__main__':
+    # summaries and rasters of the three models computed (or read from the caches) in one pass
+    xi, yi, maps = phase_maps()
+    for model, channels in maps.items():
+        print(model, {channel: round(float(np.nanmean(raster)), 3) for channel, raster in channels.items()})
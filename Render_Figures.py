@@ -0,0 +1,162 @@
+"""
+Headless rendering of the figures of the manuscript into the folder 'Figures'.
+Each figure script is run in its own process with the Agg backend, plt.show() saving the figure instead of displaying
+it. A figure is skipped when its script, the local modules it imports and its datasets have not changed since its last
+rendering with the same settings (recorded in 'Figures/.render_stamps.json'):
+    python Render_Figures.py                      # every figure, using all cores
+    python Render_Figures.py Fig3 Fig4 --dpi 150 --format pdf
+"""
+
+### libraries
+import argparse
+import ast
+import hashlib
+import json
+import os
+import runpy
+from concurrent.futures import ProcessPoolExecutor
+
+from Dataset_IO import find_dataset
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# figure: (script, output name, datasets read from the folder 'data')
+FIGURES = {'Fig1': ('Fig1.py', 'Figure_1', ['df_one_no_mimicry_plk']),
+           'Fig2': ('Fig2.py', 'Figure_2', ['df_two_no_mimicry_lk', 'df_two_mimicry_lk']),
+           'Fig3': ('Fig3.py', 'Figure_3', ['df_two_no_mimicry', 'df_two_no_mimicry_l1l2', 'df_two_no_mimicry_k1k2']),
+           'Fig4': ('Fig4.py', 'Figure_4', ['df_two_mimicry', 'df_two_mimicry_l1l2', 'df_two_mimicry_k1k2']),
+           'Fig5': ('Fig5.py', 'Figure_5', ['df_two_dslm']),
+           'FigS3': ('FigS3.py', 'Figure_S3', ['df_one_no_mimicry_aB']),
+           'FigS4': ('FigS4_Linear_regression.py', 'Figure_S4', ['df_one_no_mimicry_regression'])}
+
+
+def local_modules(script):
+    """
+    :param script: name of a python file of the repository
+    :return: set of the python files of the repository imported by the script, directly or not (script included)
+    """
+    files, stack = set(), [script]
+    while stack:
+        file = stack.pop()
+        if file in files:
+            continue
+        files.add(file)
+        with open(os.path.join(ROOT, file)) as source:
+            tree = ast.parse(source.read())
+        for node in ast.walk(tree):
+            names = [alias.name for alias in node.names] if isinstance(node, ast.Import) else \
+                [node.module] if isinstance(node, ast.ImportFrom) and node.module else []
+            stack.extend(name + '.py' for name in names if os.path.exists(os.path.join(ROOT, name + '.py')))
+    return files
+
+
+def stamp(figure, dpi, fmt):
+    """
+    :param figure: key of FIGURES
+    :param dpi: resolution of the output
+    :param fmt: format of the output
+    :return: hash of the code (content of the script and of its local modules), of the datasets (size and modification
+    time) and of the settings of a figure
+    """
+    script, _, datasets = FIGURES[figure]
+    digest = hashlib.sha256(json.dumps([dpi, fmt]).encode())
+    for file in sorted(local_modules(script)):
+        with open(os.path.join(ROOT, file), 'rb') as source:
+            digest.update(file.encode() + source.read())
+    for name in datasets:
+        try:
+            path = find_dataset(name, os.path.join(ROOT, 'data'))
+        except FileNotFoundError:
+            digest.update('{0}:missing'.format(name).encode())  # the rendering will fail and report it
+            continue
+        status = os.stat(path)
+        digest.update('{0}:{1}:{2}'.format(os.path.basename(path), status.st_size, status.st_mtime_ns).encode())
+    return digest.hexdigest()
+
+
+def render_figure(figure, output='./Figures', dpi=300, fmt='png'):
+    """
+    Run a figure script headlessly, the figure shown by plt.show() being saved as '{output}/{output name}.{fmt}'
+    :param figure: key of FIGURES
+    :param output: folder of the figures
+    :param dpi: resolution of the output
+    :param fmt: format of the output ('png', 'pdf', 'svg'...)
+    :return: path of the figure
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    script, name, _ = FIGURES[figure]
+    path = os.path.join(os.path.abspath(output), '{0}.{1}'.format(name, fmt))
+
+    def show(*args, **kwargs):
+        plt.gcf().savefig(path, dpi=dpi, format=fmt)
+
+    plt.show = show
+    os.chdir(ROOT)  # the scripts read their datasets from './data'
+    try:
+        runpy.run_path(os.path.join(ROOT, script), run_name='__main__')
+    finally:
+        plt.close('all')
+    return path
+
+
+def render(figures=None, output='./Figures', dpi=300, fmt='png', workers=None, force=False):
+    """
+    :param figures: keys of FIGURES to render, None for all
+    :param output: folder of the figures
+    :param dpi: resolution of the outputs
+    :param fmt: format of the outputs
+    :param workers: number of processes (by default one per core)
+    :param force: if True, render the figures even if they are up to date
+    :return: list of the figures rendered
+    """
+    figures = list(FIGURES) if figures is None else list(figures)
+    os.makedirs(output, exist_ok=True)
+    stamps_path = os.path.join(output, '.render_stamps.json')
+    stamps = {}
+    if os.path.exists(stamps_path):
+        with open(stamps_path) as file:
+            stamps = json.load(file)
+
+    stamps_now = {figure: stamp(figure, dpi, fmt) for figure in figures}
+    todo = [figure for figure in figures if force or stamps.get(figure) != stamps_now[figure] or not os.path.exists(
+        os.path.join(output, '{0}.{1}'.format(FIGURES[figure][1], fmt)))]
+    for figure in [figure for figure in figures if figure not in todo]:
+        print('{0}: up to date'.format(figure))
+
+    if todo:
+        workers = min(workers or os.cpu_count(), len(todo))
+        # a new process per figure, so that the state of matplotlib does not leak from one script to the next; the
+        # processes are not daemonic, so that the scripts can run their simulations on a pool of their own (FigS4)
+        with ProcessPoolExecutor(workers, max_tasks_per_child=1) as pool:
+            results = [pool.submit(render_figure, figure, output, dpi, fmt) for figure in todo]
+            for figure, result in zip(todo, results):
+                try:
+                    print('{0}: {1}'.format(figure, result.result()))
+                    stamps[figure] = stamps_now[figure]
+                except Exception as error:
+                    print('{0}: failed ({1!r})'.format(figure, error))
+                    stamps.pop(figure, None)
+
+        with open(stamps_path, 'w') as file:
+            json.dump(stamps, file, indent=1)
+
+    return todo
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('figures', nargs='*', help='figures to render among {0} (default: all)'.format(
+        ', '.join(FIGURES)))
+    parser.add_argument('--output', default=os.path.join(ROOT, 'Figures'), help='folder of the figures')
+    parser.add_argument('--dpi', type=int, default=300)
+    parser.add_argument('--format', default='png')
+    parser.add_argument('--workers', type=int, help='number of processes (default: one per core)')
+    parser.add_argument('--force', action='store_true', help='render up to date figures too')
+    args = parser.parse_args()
+    if set(args.figures) - set(FIGURES):
+        parser.error('unknown figures: {0}'.format(', '.join(sorted(set(args.figures) - set(FIGURES)))))
+
+    render(args.figures or None, args.output, args.dpi, args.format, args.workers, args.force)
@@ -0,0 +1,130 @@
+"""
+Persistent cache of the results of solver, so that parameter sets already solved in a previous run (e.g. when a
+value is added to a sweep) are read from disk instead of being integrated again.
+The results are stored in a SQLite file, keyed by a hash of the function, the rounded parameters, the engine settings
+and the version of Functions_Library.
+"""
+
+### libraries
+import hashlib
+import os
+import sqlite3
+import time
+
+import Functions_Library
+
+with open(Functions_Library.__file__, 'rb') as file:
+    CODE_VERSION = hashlib.sha256(file.read()).hexdigest()[:16]  # results are invalidated when the library changes
+
+
+class SolverCache:
+    """
+    On-disk store of [eq_sp1, eq_sp2, coexistence, F1, M1, F2, M2] results, with least recently used eviction once
+    max_entries results are stored and hit/miss counters.
+    """
+
+    def __init__(self, path='./solver_cache.sqlite', max_entries=1000000, decimals=10):
+        """
+        :param path: path of the SQLite file
+        :param max_entries: maximal number of results kept in the cache
+        :param decimals: number of decimals to which parameters are rounded in the keys
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.decimals = decimals
+        self.hits = 0
+        self.misses = 0
+
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, eq_sp1 INTEGER, "
+                                "eq_sp2 INTEGER, coexistence INTEGER, F1 REAL, M1 REAL, F2 REAL, M2 REAL, "
+                                "last_used REAL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS last_used_index ON results (last_used)")
+        self.connection.commit()
+
+    def key(self, func, params, settings=''):
+        """
+        :param func: function to use (no_mimicry, mimicry or dslm)
+        :param params: (AB,SR,ab,sr,b,d,p,l1,k1,l2,k2,cw,cb,K,a,B)
+        :param settings: description of the engine and of its settings
+        :return: key of the result in the cache
+        """
+        rounded = ','.join(repr(round(float(x), self.decimals)) for x in params)
+        text = '|'.join([func.__name__, rounded, str(settings), CODE_VERSION])
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get_many(self, keys):
+        """
+        :param keys: list of keys
+        :return: dictionary {key: result} of the keys found in the cache
+        """
+        found = {}
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            rows = self.connection.execute(
+                "SELECT key, eq_sp1, eq_sp2, coexistence, F1, M1, F2, M2 FROM results WHERE key IN ({0})".format(
+                    ','.join('?' * len(batch))), batch).fetchall()
+            found.update({row[0]: list(row[1:]) for row in rows})
+
+        if found:
+            now = time.time()
+            self.connection.executemany("UPDATE results SET last_used = ? WHERE key = ?",
+                                        [(now, key) for key in found])
+            self.connection.commit()
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """
+        :param items: list of (key, result) to store
+        """
+        now = time.time()
+        self.connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                    [(key, int(result[0]), int(result[1]), int(result[2]), float(result[3]),
+                                      float(result[4]), float(result[5]), float(result[6]), now)
+                                     for key, result in items])
+        self.connection.commit()
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used results beyond max_entries
+        """
+        count = self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        if count > self.max_entries:
+            self.connection.execute("DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_used "
+                                    "LIMIT ?)", (count - self.max_entries,))
+            self.connection.commit()
+
+    def solve_many(self, func, parameters, compute, settings=''):
+        """
+        :param func: function to use (no_mimicry, mimicry or dslm)
+        :param parameters: list of (AB,SR,ab,sr,b,d,p,l1,k1,l2,k2,cw,cb,K,a,B)
+        :param compute: function computing the list of results of a list of parameters
+        :param settings: description of the engine and of its settings
+        :return: list of results, in the order of parameters, only the parameters missing from the cache being computed
+        """
+        keys = [self.key(func, params, settings) for params in parameters]
+        found = self.get_many(keys)
+
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        if missing:
+            computed = compute([parameters[i] for i in missing])
+            found.update({keys[i]: result for i, result in zip(missing, computed)})
+            self.put_many([(keys[i], result) for i, result in zip(missing, computed)])
+
+        return [found[key] for key in keys]
+
+    def solve(self, func, *params, engine=Functions_Library.solver, settings=''):
+        """
+        Cached call of engine(func, *params)
+        """
+        return self.solve_many(func, [params], lambda missing: [engine(func, *missing[0])], settings)[0]
+
+    def close(self):
+        self.connection.close()
+
+    def __repr__(self):
+        return "SolverCache('{0}', hits={1}, misses={2})".format(os.path.abspath(self.path), self.hits, self.misses)
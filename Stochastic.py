@@ -0,0 +1,271 @@
+"""
+Stochastic counterpart of the differential equations systems of Functions_Library, with demographic noise: each
+birth and death of a female or a male is an event occurring at the rate given by the terms of the equations, so that
+small populations can go extinct by chance.
+Many replicate populations (and parameter sets) are simulated at once by tau-leaping, vectorized with NumPy: during a
+leap of length tau, the numbers of births and deaths of each state variable are Poisson distributed. The leap of each
+replicate is adapted to its rates (Cao, Gillespie & Petzold 2006), the expected relative change of each abundance being
+bounded by eps, so that leaps are short when populations are small.
+A species goes extinct when no female remains (its males cannot reproduce and are removed).
+"""
+
+### libraries
+import multiprocessing as mp
+import warnings
+from functools import partial
+
+import numpy as np
+import numpy.random as npr
+import pandas as pd
+
+from Functions_Library import g_, no_mimicry, mimicry, dslm, solver, PARAMETER_NAMES
+from Dataset_IO import save_dataset
+from Sweeps import default_sweep, get_sweep
+
+# quantiles of the extinction times written by stochastic_dataframe_generator
+QUANTILES = (0.1, 0.5, 0.9)
+
+
+def propensities(func, n, param_dict):
+    """
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param n: array of shape (4, R) containing the numbers of females and males [F1,M1,F2,M2] of R populations
+    :param param_dict: dictionary for all parameters, each value being a number or an array of length R
+    :return: arrays of shape (4, R) of the rates at which each state variable gains (births) and loses (deaths) one
+    individual, births - deaths being equal to func(n, 0, param_dict)
+    """
+    b = param_dict['b']
+    d = param_dict['d']
+    p = param_dict['p']
+    l1 = param_dict['l1']
+    k1 = param_dict['k1']
+    l2 = param_dict['l2']
+    k2 = param_dict['k2']
+    cw = param_dict['cw']
+    cb = param_dict['cb']
+    K = param_dict['K']
+    a = param_dict['a']
+    B = param_dict['B']
+
+    rho1 = np.divide(n[1], (n[0] + n[1]), out=np.zeros_like(n[1]), where=(n[0] + n[1]) > 0)
+    rho2 = np.divide(n[3], (n[2] + n[3]), out=np.zeros_like(n[3]), where=(n[2] + n[3]) > 0)
+
+    # denominators of the predation terms of F1, M1, F2, M2
+    if func is no_mimicry:
+        DF1 = 1 + l1 * n[0] * (1 - B * rho1)
+        DF2 = 1 + l2 * n[2] * (1 - B * rho2)
+        DM1, DM2 = DF1, DF2
+    elif func is mimicry:
+        rho3 = np.divide((n[1] + n[3]), (n[0] + n[1] + n[2] + n[3]), out=np.zeros_like(n[3]),
+                         where=(n[0] + n[1] + n[2] + n[3]) > 0)
+        DF1 = 1 + (l1 * n[0] + l2 * n[2]) * (1 - B * rho3)
+        DM1, DF2, DM2 = DF1, DF1, DF1
+    elif func is dslm:
+        rho3 = np.divide((n[1] + n[3]), (n[1] + n[0] + n[3]), out=np.zeros_like(n[3]),
+                         where=(n[1] + n[0] + n[3]) > 0)
+        DF1 = 1 + l1 * n[0] * (1 - B * rho3)
+        DF2 = 1 + l2 * n[2]
+        DM1, DM2 = DF1, DF1
+    else:
+        raise ValueError("no stochastic counterpart of {0}".format(func.__name__))
+
+    g1, g2 = g_(k1, rho1), g_(k2, rho2)
+
+    # predation of the females is a gain when their sting brings a direct advantage larger than the predation (a l > 1)
+    predation_F1 = n[0] * p * (1 - a * l1) / DF1
+    predation_F2 = n[2] * p * (1 - a * l2) / DF2
+
+    births = np.array([n[0] * b * g1 + np.maximum(-predation_F1, 0),
+                       n[0] * b * (1 - g1),
+                       n[2] * b * g2 + np.maximum(-predation_F2, 0),
+                       n[2] * b * (1 - g2)])
+    deaths = np.array([d * n[0] + np.maximum(predation_F1, 0) + (cw * n[0] + cb * n[2]) * n[0] / K,
+                       d * n[1] + n[1] * p / DM1,
+                       d * n[2] + np.maximum(predation_F2, 0) + (cw * n[2] + cb * n[0]) * n[2] / K,
+                       d * n[3] + n[3] * p / DM2])
+    return births, deaths
+
+
+def tau_leaping(func, state, param_dict, t_max=1000, eps=0.03, tau_max=1, rng=None):
+    """
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param state: array of shape (4, R) of the initial numbers of females and males [F1,M1,F2,M2] of R populations
+    :param param_dict: dictionary for all parameters, each value being a number or an array of length R
+    :param t_max: time at which the simulations stop
+    :param eps: bound on the expected relative change of the abundances during a leap
+    :param tau_max: maximal length of a leap (resolution of the extinction times of large populations)
+    :param rng: numpy.random.Generator (a new one if None)
+    :return: array of shape (4, R) of the final states, and array of shape (2, R) of the extinction times of each
+    species (inf if it persists until t_max, nan if it is absent from the start, 0 if it is present but none of its
+    females remains once the initial numbers are rounded)
+    """
+    rng = npr.default_rng() if rng is None else rng
+    state = np.array(state, dtype='float64')
+    n = np.round(state)
+    R = n.shape[1]
+    param_dict = {key: np.broadcast_to(np.asarray(value, dtype='float64'), (R,)) for key, value in param_dict.items()}
+
+    t = np.zeros(R)
+    # presence is decided before rounding: a species of a few individuals may start without any female
+    present = state[[0, 2]] + state[[1, 3]] > 0
+    alive = n[[0, 2]] > 0
+    n[[1, 3]] *= alive
+    times = np.where(alive, np.inf, np.where(present, 0, np.nan))
+
+    active = np.flatnonzero(alive.any(axis=0))
+    while active.size:
+        params = {key: value[active] for key, value in param_dict.items()}
+        n_a = n[:, active]
+        births, deaths = propensities(func, n_a, params)
+
+        # leap bounding the expected change (mean and standard deviation) of each abundance
+        bound = np.maximum(eps * n_a, 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tau = np.minimum(bound / np.abs(births - deaths), bound ** 2 / (births + deaths))
+        tau = np.nan_to_num(tau, nan=np.inf).min(axis=0)
+        tau = np.minimum(np.minimum(tau, tau_max), t_max - t[active])
+
+        n_a = np.maximum(n_a + rng.poisson(births * tau) - rng.poisson(deaths * tau), 0)
+        t[active] += tau
+
+        for species in range(2):
+            extinct = alive[species, active] & (n_a[2 * species] == 0)
+            n_a[2 * species + 1, extinct] = 0
+            times[species, active[extinct]] = t[active[extinct]]
+            alive[species, active[extinct]] = False
+
+        n[:, active] = n_a
+        active = active[alive[:, active].any(axis=0) & (t[active] < t_max)]
+
+    return n, times
+
+
+def simulate(func, parameters, replicates=1000, t_max=1000, eps=0.03, tau_max=1, seed=None):
+    """
+    Replicate populations of each parameter set, simulated together
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param parameters: array of shape (P, 16) of parameter sets (AB,SR,ab,sr,b,d,p,l1,k1,l2,k2,cw,cb,K,a,B) as in
+    solver, the initial numbers of females and males being rounded
+    :param replicates: number of replicate populations per parameter set
+    :param t_max: time at which the simulations stop
+    :param eps: bound on the expected relative change of the abundances during a leap (see tau_leaping)
+    :param tau_max: maximal length of a leap
+    :param seed: seed of the random generator
+    :return: array of shape (P, replicates, 4) of the final states and array of shape (P, replicates, 2) of the
+    extinction times of each species (see tau_leaping)
+    """
+    parameters = np.atleast_2d(np.asarray(parameters, dtype='float64'))
+    columns = np.repeat(parameters, replicates, axis=0)
+    AB, SR, ab, sr = columns[:, :4].T
+
+    state = np.array([AB * (1 - SR), AB * SR,
+                      ab * (1 - sr), ab * sr], dtype='float64')
+    param_dict = {name: columns[:, i] for i, name in enumerate(PARAMETER_NAMES) if i >= 4}
+
+    final, times = tau_leaping(func, state, param_dict, t_max, eps, tau_max, npr.default_rng(seed))
+    return (final.T.reshape(len(parameters), replicates, 4),
+            times.T.reshape(len(parameters), replicates, 2))
+
+
+def extinction_summary(times):
+    """
+    :param times: array of shape (P, replicates, 2) of extinction times (see simulate)
+    :return: dataframe with one row per parameter set: probabilities of extinction of each species 'p_ext_sp1',
+    'p_ext_sp2' (nan for an absent species) and of coexistence until t_max 'p_coexistence', and the mean and QUANTILES
+    of the extinction times of the replicates in which each species went extinct
+    """
+    summary = {}
+    for species in range(2):
+        t = times[:, :, species]
+        present = ~np.isnan(t).all(axis=1)
+        extinct = np.isfinite(t)
+        summary['p_ext_sp{0}'.format(species + 1)] = np.where(present, extinct.mean(axis=1), np.nan)
+
+        t = np.where(extinct, t, np.nan)
+        with warnings.catch_warnings():
+            # no extinction among the replicates
+            warnings.simplefilter('ignore', RuntimeWarning)
+            summary['t_ext_sp{0}_mean'.format(species + 1)] = np.nanmean(t, axis=1) if t.size else np.nan
+            for q in QUANTILES:
+                summary['t_ext_sp{0}_q{1:02.0f}'.format(species + 1, 100 * q)] = np.nanquantile(t, q, axis=1)
+
+    summary['p_coexistence'] = np.mean(np.isinf(times).all(axis=2), axis=1)
+    return pd.DataFrame(summary)
+
+
+def simulate_block(func, replicates, t_max, eps, tau_max, block):
+    """
+    :param block: (first index, parameter sets, seed) of a block of parameter sets
+    :return: summary of the block (see extinction_summary)
+    """
+    first, parameters, seed = block
+    summary = extinction_summary(simulate(func, parameters, replicates, t_max, eps, tau_max, seed)[1])
+    summary.index = range(first, first + len(parameters))
+    return summary
+
+
+def stochastic_dataframe_generator(func=mimicry, sp2=True, N=5, comp=0.3, label='', replicates=1000, t_max=1000,
+                                   eps=0.03, tau_max=1, workers=1, block=20, seed=None, fmt='csv', sweep=None):
+    """
+    Stochastic counterpart of Dataframe_Generator.dataframe_generator: for each parameter set of the sweep, replicate
+    populations are simulated and their extinctions summarized.
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param sp2: True for two species, False for one species only (default sweep)
+    :param N: number of simulations batches
+    :param comp: interspecific competition value (default sweep)
+    :param label: suffix of the file name
+    :param replicates: number of replicate populations per parameter set
+    :param t_max: time at which the simulations stop
+    :param eps: bound on the expected relative change of the abundances during a leap (see tau_leaping)
+    :param tau_max: maximal length of a leap
+    :param workers: number of processes used to run the simulations
+    :param block: number of parameter sets simulated together (block * replicates populations)
+    :param seed: seed of the random generators, one being derived per block so that the dataset does not depend on
+    workers
+    :param fmt: format of the dataset (see Dataset_IO)
+    :param sweep: SweepSpec, name of a sweep of Sweeps.SWEEPS or path of a JSON sweep file (see dataframe_generator)
+    :return: a dataframe file with all parameters value, extinction probabilities and extinction times (see
+    extinction_summary)
+    """
+    spec = default_sweep(sp2, comp) if sweep is None else get_sweep(sweep)
+    if seed is None:
+        seed = npr.SeedSequence().entropy
+
+    parameters = spec.parameters(N, seed)[:]
+    seeds = npr.SeedSequence(seed).spawn(-(-len(parameters) // block))
+    blocks = [(first, parameters[first:first + block], seeds[i])
+              for i, first in enumerate(range(0, len(parameters), block))]
+
+    run = partial(simulate_block, func, replicates, t_max, eps, tau_max)
+    if workers > 1:
+        with mp.Pool(workers) as pool:
+            summaries = pool.map(run, blocks, chunksize=1)
+    else:
+        summaries = [run(item) for item in blocks]
+
+    df = pd.concat([pd.DataFrame(parameters, columns=PARAMETER_NAMES)] + [pd.concat(summaries)], axis=1)
+    metadata = {'model': func.__name__,
+                'sweep': spec.to_dict(),
+                'N': N,
+                'engine': 'tau_leaping',
+                'seed': seed,
+                'stochastic': {'replicates': replicates, 't_max': t_max, 'eps': eps, 'tau_max': tau_max,
+                               'block': block}}
+    save_dataset(df, "./df_{0}".format(label), fmt, metadata)
+
+
+if __name__ == '__main__':
+    # the rates of the events give back the differential equations systems
+    n = np.array([[300, 5, 0], [400, 2, 0], [200, 1, 30], [300, 0, 20]], dtype='float64')
+    param_dict = dict(zip(PARAMETER_NAMES[4:], (1, 0.2, 0.3, 0.05, 3, 0.04, 3, 1, 0.3, 1000, 5, 0.8)))
+    for func in (no_mimicry, mimicry, dslm):
+        births, deaths = propensities(func, n, param_dict)
+        assert np.allclose(births - deaths, func(n, 0, param_dict))
+
+    # extinction risk of one species starting from a few individuals, persisting in the deterministic model
+    for AB in (2, 10, 50):
+        params = (AB, 0.5, 0, 0, 0.85, 0.2, 0.3, 0.02, 3, 0, 1, 1, 0, 1000, 5, 0.8)
+        final, times = simulate(no_mimicry, [params], replicates=2000, t_max=200, seed=0)
+        survivors = final[0][np.isinf(times[0, :, 0])]
+        print(AB, extinction_summary(times).iloc[0].round(3).to_dict(), 'survivors (F1, M1):',
+              survivors[:, :2].mean(axis=0).round(1), 'deterministic:', np.round(solver(no_mimicry, *params)[3:5], 1))
@@ -0,0 +1,199 @@
+"""
+Declarative description of the parameter sweeps run by Dataframe_Generator.
+A sweep gives, for each of the 16 parameters of solver, either a fixed value, a random interval (drawn once per batch
+of simulations) or a list of values (grid axis, all combinations of the axes being simulated in each batch).
+Parameters are generated lazily as NumPy arrays, by blocks of consecutive simulations.
+"""
+
+### libraries
+import json
+
+import numpy as np
+import numpy.random as npr
+
+from Functions_Library import PARAMETER_NAMES
+
+
+class SweepSpec:
+    """
+    Sweep over the parameters (AB,SR,ab,sr,b,d,p,l1,k1,l2,k2,cw,cb,K,a,B) of solver.
+    """
+
+    def __init__(self, fixed=None, random=None, grid=None, tied=None):
+        """
+        :param fixed: dictionary {parameter: value}
+        :param random: dictionary {parameter: (minimum, maximum)} of the parameters drawn uniformly in each batch,
+        in the order in which they are drawn
+        :param grid: dictionary {parameter: [x1,x2...xn]} of the parameters of interest, the last one varying fastest
+        :param tied: dictionary {parameter: other parameter} of the parameters equal to another one (e.g. l2 = l1)
+        """
+        self.fixed = dict(fixed or {})
+        self.random = {name: list(bounds) for name, bounds in (random or {}).items()}
+        self.grid = {name: list(values) for name, values in (grid or {}).items()}
+        self.tied = dict(tied or {})
+
+        given = list(self.fixed) + list(self.random) + list(self.grid) + list(self.tied)
+        missing = set(PARAMETER_NAMES) - set(given)
+        repeated = set(name for name in given if given.count(name) > 1)
+        unknown = set(given) - set(PARAMETER_NAMES)
+        if missing or repeated or unknown:
+            raise ValueError("each parameter must be given once: missing {0}, repeated {1}, unknown {2}".format(
+                sorted(missing), sorted(repeated), sorted(unknown)))
+
+    @property
+    def grid_size(self):
+        """
+        :return: number of simulations per batch
+        """
+        return int(np.prod([len(values) for values in self.grid.values()]))
+
+    def parameters(self, N, seed=None):
+        """
+        :param N: number of simulations batches
+        :param seed: seed of the random generator drawing the random parameters
+        :return: SweepParameters, sliceable sequence of the N * grid_size parameter sets
+        """
+        rng = npr.default_rng(seed)
+        if self.random:
+            bounds = np.array(list(self.random.values()), dtype='float64')
+            draws = rng.uniform(bounds[:, 0], bounds[:, 1], size=(N, len(self.random)))
+        else:
+            draws = np.zeros((N, 0))
+        return SweepParameters(self, draws)
+
+    def to_dict(self):
+        return {'fixed': self.fixed, 'random': self.random, 'grid': self.grid, 'tied': self.tied}
+
+    @classmethod
+    def from_dict(cls, spec):
+        return cls(**spec)
+
+    def to_json(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=1)
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path) as file:
+            return cls.from_dict(json.load(file))
+
+    def __repr__(self):
+        return 'SweepSpec({0})'.format(self.to_dict())
+
+
+class SweepParameters:
+    """
+    Parameter sets of a sweep, computed on demand: sweep[i:j] is an array of shape (j - i, 16).
+    """
+
+    def __init__(self, spec, draws):
+        """
+        :param spec: SweepSpec
+        :param draws: array of shape (N, number of random parameters) of the random parameters of each batch
+        """
+        self.spec = spec
+        self.draws = draws
+        self.grid_values = [np.asarray(values, dtype='float64') for values in spec.grid.values()]
+        self.grid_shape = tuple(len(values) for values in self.grid_values)
+
+    def __len__(self):
+        return len(self.draws) * self.spec.grid_size
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0] if item >= 0 else self[len(self) + item]
+        index = np.arange(len(self))[item]
+
+        batch, cell = np.divmod(index, self.spec.grid_size)
+        cell = np.unravel_index(cell, self.grid_shape) if self.grid_shape else ()
+
+        block = np.empty((len(index), len(PARAMETER_NAMES)), dtype='float64')
+        columns = {}
+        for name, value in self.spec.fixed.items():
+            columns[name] = np.full(len(index), value, dtype='float64')
+        for j, name in enumerate(self.spec.random):
+            columns[name] = self.draws[batch, j]
+        for j, name in enumerate(self.spec.grid):
+            columns[name] = self.grid_values[j][cell[j]]
+        for name, other in self.spec.tied.items():
+            columns[name] = columns[other]
+
+        for j, name in enumerate(PARAMETER_NAMES):
+            block[:, j] = columns[name]
+        return block
+
+    def __iter__(self):
+        for first in range(0, len(self), 10000):
+            yield from self[first:first + 10000]
+
+
+def default_sweep(sp2=True, comp=0.3):
+    """
+    Sweep of (a, B) historically hard-coded in dataframe_generator
+    :param sp2: True for two species, False for one species only
+    :param comp: interspecific competition value (0 for one species)
+    :return: SweepSpec
+    """
+    random = {'AB': (1, 1000), 'SR': (0.2, 0.8), 'ab': (1, 1000), 'sr': (0.2, 0.8), 'b': (0.7, 1), 'd': (0.1, 0.3),
+              'k1': (0.3, 0.7)}
+    fixed = {'p': 0.6, 'l1': 0.02, 'l2': 0, 'k2': 1, 'cw': 1, 'cb': comp, 'K': 1000}
+    if not sp2:
+        del random['ab'], random['sr']
+        fixed.update({'ab': 0, 'sr': 0, 'cb': 0})
+
+    return SweepSpec(fixed=fixed, random=random,
+                     grid={'a': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10],  # parameter of interest 1
+                           'B': [0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1]})  # parameter of interest 2
+
+
+# initial conditions and demographic rates drawn in each batch
+RANDOM_ONE = {'AB': (1, 1000), 'SR': (0.2, 0.8), 'b': (0.7, 1), 'd': (0.1, 0.3)}
+RANDOM_TWO = {'AB': (1, 1000), 'SR': (0.2, 0.8), 'ab': (1, 1000), 'sr': (0.2, 0.8), 'b': (0.7, 1), 'd': (0.1, 0.3)}
+
+# sweeps of the datasets read by the figure scripts (values of the swept axes can be edited here)
+SWEEPS = {
+    # FigS3: persistence of one species in the (a, B) plane
+    'aB': default_sweep(sp2=False),
+    # Fig1: sex-ratio of one species in the (p, l1) plane for two investments in sons
+    'plk': SweepSpec(fixed={'ab': 0, 'sr': 0, 'l2': 0, 'k2': 1, 'cw': 1, 'cb': 0, 'K': 1000, 'a': 5, 'B': 0.8},
+                     random=RANDOM_ONE,
+                     grid={'k1': [2, 5], 'p': list(np.round(np.linspace(0, 1, 21), 2)),
+                           'l1': list(np.round(np.linspace(0, 0.1, 21), 3))}),
+    # Fig2: coexistence of two species sharing the same defence level and investment in sons
+    'lk': SweepSpec(fixed={'p': 0.6, 'cw': 1, 'cb': 0.3, 'K': 1000, 'a': 5, 'B': 0.8},
+                    random=RANDOM_TWO,
+                    grid={'l1': list(np.round(np.linspace(0, 0.1, 11), 3)), 'k1': [1, 2, 3, 4, 5]},
+                    tied={'l2': 'l1', 'k2': 'k1'}),
+    # Fig3/Fig4 (b): defence levels of the two species
+    'l1l2': SweepSpec(fixed={'p': 0.6, 'k1': 3, 'k2': 3, 'cw': 1, 'cb': 0.3, 'K': 1000, 'a': 5, 'B': 0.8},
+                      random=RANDOM_TWO,
+                      grid={'l1': list(np.round(np.linspace(0, 0.04, 9), 3)),
+                            'l2': list(np.round(np.linspace(0, 0.04, 9), 3))}),
+    # Fig3/Fig4 (c): investments in sons of the two species
+    'k1k2': SweepSpec(fixed={'p': 0.6, 'l1': 0.02, 'l2': 0.02, 'cw': 1, 'cb': 0.3, 'K': 1000, 'a': 5, 'B': 0.8},
+                      random=RANDOM_TWO,
+                      grid={'k1': [1, 2, 3, 4, 5], 'k2': [1, 2, 3, 4, 5]}),
+    # Fig3/Fig4/Fig5 (a): relative defence levels and investments in sons of the two species
+    'l1l2k1k2': SweepSpec(fixed={'p': 0.6, 'cw': 1, 'cb': 0.3, 'K': 1000, 'a': 5, 'B': 0.8},
+                          random=RANDOM_TWO,
+                          grid={'l1': list(np.round(np.linspace(0, 0.04, 5), 3)),
+                                'l2': list(np.round(np.linspace(0, 0.04, 5), 3)),
+                                'k1': [1, 2, 3, 4, 5], 'k2': [1, 2, 3, 4, 5]}),
+    # FigS4: sex-ratio of one species against the predation rate, for four investments in sons
+    'regression': SweepSpec(fixed={'ab': 0, 'sr': 0, 'l1': 0.01, 'l2': 0, 'k2': 1, 'cw': 1, 'cb': 0, 'K': 1000, 'a': 5,
+                                   'B': 0.8},
+                            random=dict(RANDOM_ONE, p=(0, 1)),
+                            grid={'k1': [2, 3, 4, 5]}),
+}
+
+
+def get_sweep(sweep):
+    """
+    :param sweep: SweepSpec, name of a sweep of SWEEPS or path of a JSON file describing a sweep
+    :return: SweepSpec
+    """
+    if isinstance(sweep, SweepSpec):
+        return sweep
+    if sweep in SWEEPS:
+        return SWEEPS[sweep]
+    return SweepSpec.from_json(sweep)
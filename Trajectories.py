@@ -0,0 +1,115 @@
+"""
+Recording of the trajectories [F1,M1,F2,M2] of selected parameter sets, to study the transient dynamics (e.g. the
+convergence of the sex-ratio) instead of the equilibrium only.
+The trajectories are downsampled on the fly to a common time grid and written to a memory-mapped .npy file of shape
+(number of parameter sets, number of times, 4), each process writing its rows in place. The file can hold millions of
+trajectories and is sliced lazily by load_trajectories. The parameter sets and the time grid are stored next to it
+('{stem}.parameters.npy' and '{stem}.json').
+Recording is opt-in (record argument of solver): the simulations of Dataframe_Generator are not affected.
+"""
+
+### libraries
+import json
+import multiprocessing as mp
+from functools import partial
+
+import numpy as np
+
+from Functions_Library import solver, no_mimicry, mimicry, dslm, PARAMETER_NAMES
+
+MODELS = {func.__name__: func for func in (no_mimicry, mimicry, dslm)}
+
+
+def record_chunk(stem, model, steady, first, parameters):
+    """
+    Integrate parameter sets and write their trajectories in the memory-mapped file
+    :param stem: path of the files without extension
+    :param model: 'no_mimicry', 'mimicry' or 'dslm'
+    :param steady: if True, solver is run in steady-state mode
+    :param first: index of the first parameter set in the file
+    :param parameters: array of the parameter sets (AB,SR,ab,sr,b,d,p,l1,k1,l2,k2,cw,cb,K,a,B)
+    :return: number of trajectories written
+    """
+    with open(stem + '.json') as file:
+        times = np.array(json.load(file)['times'], dtype='float64')
+    trajectories = np.load(stem + '.npy', mmap_mode='r+')
+    out = np.empty((len(times), 4), dtype='float64')
+
+    for i, params in enumerate(parameters):
+        solver(MODELS[model], *params, steady=steady, record=(times, out))
+        trajectories[first + i] = out
+    trajectories.flush()
+    return len(parameters)
+
+
+def record_trajectories(func, parameters, stem, times=np.linspace(0, 1000, 201), steady=False, dtype='float32',
+                        workers=1, chunk=1000):
+    """
+    :param func: function to use (no_mimicry, mimicry or dslm)
+    :param parameters: array or sliceable sequence (e.g. Sweeps.SweepParameters) of (AB,SR,ab,sr,b,d,p,l1,k1,l2,k2,
+    cw,cb,K,a,B)
+    :param stem: path of the files without extension (e.g. './data/traj_mimicry')
+    :param times: increasing times at which the states are recorded (linear interpolation of the integrated
+    trajectory, the final state being repeated after the equilibrium or the extinction)
+    :param steady: if True, solver is run in steady-state mode, the trajectory being then interpolated between its
+    samples, taken every 10 time units
+    :param dtype: type of the stored states ('float32' halves the size of the file)
+    :param workers: number of processes writing the trajectories
+    :param chunk: number of parameter sets solved by a process at once
+    :return: memory-mapped array of the trajectories (see load_trajectories)
+    """
+    times = np.asarray(times, dtype='float64')
+    if np.any(np.diff(times) <= 0):
+        raise ValueError("the recorded times must be increasing")
+    n = len(parameters)
+
+    trajectories = np.lib.format.open_memmap(stem + '.npy', mode='w+', dtype=dtype, shape=(n, len(times), 4))
+    del trajectories
+    saved = np.lib.format.open_memmap(stem + '.parameters.npy', mode='w+', dtype='float64',
+                                      shape=(n, len(PARAMETER_NAMES)))
+    for first in range(0, n, chunk):
+        saved[first:first + chunk] = parameters[first:first + chunk]
+    saved.flush()
+    del saved
+    with open(stem + '.json', 'w') as file:
+        json.dump({'model': func.__name__, 'steady': steady, 'times': times.tolist(),
+                   'columns': ['F1', 'M1', 'F2', 'M2']}, file)
+
+    # the parameters are read back from the file by chunks, so that they are not all held in memory
+    parameters = np.load(stem + '.parameters.npy', mmap_mode='r')
+    tasks = [(first, parameters[first:first + chunk]) for first in range(0, n, chunk)]
+    run = partial(record_chunk, stem, func.__name__, steady)
+    if workers > 1:
+        with mp.Pool(workers) as pool:
+            pool.starmap(run, tasks, chunksize=1)
+    else:
+        for first, block in tasks:
+            run(first, block)
+
+    return load_trajectories(stem)[0]
+
+
+def load_trajectories(stem):
+    """
+    :param stem: path of the files without extension
+    :return: read-only memory-mapped array of the trajectories, of shape (number of parameter sets, number of times, 4),
+    memory-mapped array of the parameter sets and dictionary describing the recording ('model', 'steady', 'times')
+    """
+    with open(stem + '.json') as file:
+        description = json.load(file)
+    description['times'] = np.array(description['times'])
+    return (np.load(stem + '.npy', mmap_mode='r'), np.load(stem + '.parameters.npy', mmap_mode='r'),
+            description)
+
+
+if __name__ == '__main__':
+    # convergence of the sex-ratio of species 1 under mimicry and dslm, for the parameters of the Fig2 sweep
+    from Sweeps import SWEEPS
+
+    parameters = SWEEPS['lk'].parameters(1, seed=0)[:]
+    for func in (mimicry, dslm):
+        trajectories = record_trajectories(func, parameters, './traj_{0}'.format(func.__name__))
+        F1, M1 = trajectories[:, :, 0], trajectories[:, :, 1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sr = M1 / (F1 + M1)
+        print(func.__name__, np.nanmean(np.abs(sr[:, [10, 50, 100]] - sr[:, [-1]]), axis=0))
@@ -0,0 +1,257 @@
+"""
+Distributed generation of the datasets of Dataframe_Generator through a work queue held in a shared directory (e.g. on
+a network file system), without any service to run.
+The sweep is split into numbered shards of consecutive simulations. Workers, on any number of hosts seeing the
+directory, claim the shards one at a time with lock files created atomically (O_CREAT | O_EXCL), solve them and write
+one result file per shard. Once every shard is solved, the results are merged into the dataset:
+    python Work_Queue.py create queue_aB --model no_mimicry --sweep aB --N 100 --shard-size 1210 --seed 1
+    python Work_Queue.py work queue_aB --workers 8          # on each host
+    python Work_Queue.py status queue_aB
+    python Work_Queue.py merge queue_aB --label one_sp_no_mimicry_aB --fmt parquet
+"""
+
+### libraries
+import argparse
+import json
+import os
+import socket
+import time
+
+import numpy as np
+import numpy.random as npr
+import pandas as pd
+
+from Functions_Library import no_mimicry, mimicry, dslm
+from Dataframe_Generator import ENGINES, solve_parameters, results_dataframe
+from Dataset_IO import load_dataset, save_dataset
+from Sweeps import get_sweep, SweepSpec
+
+MODELS = {func.__name__: func for func in (no_mimicry, mimicry, dslm)}
+
+
+def shard_path(folder, kind, shard):
+    """
+    :param folder: directory of the queue
+    :param kind: 'locks' or 'results'
+    :param shard: number of the shard
+    :return: path of the lock file or of the result file (npz) of the shard
+    """
+    return os.path.join(folder, kind, 'shard-{0:05d}'.format(shard) + ('.lock' if kind == 'locks' else '.npz'))
+
+
+def create_queue(folder, model='mimicry', sweep='aB', N=5, shard_size=1000, seed=None, engine='solver',
+                 warm_start=False):
+    """
+    :param folder: directory of the queue, created if needed
+    :param model: 'no_mimicry', 'mimicry' or 'dslm'
+    :param sweep: SweepSpec, name of a sweep of Sweeps.SWEEPS or path of a JSON sweep file
+    :param N: number of simulations batches
+    :param shard_size: number of simulations per shard (rounded to whole batches with warm_start)
+    :param seed: seed of the random generator drawing the random parameters (drawn if None, and recorded)
+    :param engine: name of the engine in Dataframe_Generator.ENGINES
+    :param warm_start: if True, the batches are solved with warm starts (see Dataframe_Generator.run_batch)
+    :return: description of the queue, written to '{folder}/queue.json'
+    """
+    if model not in MODELS:
+        raise ValueError("unknown model '{0}', expected one of {1}".format(model, list(MODELS)))
+    spec = get_sweep(sweep)
+    if seed is None:
+        seed = npr.SeedSequence().entropy
+    if warm_start:
+        shard_size = max(1, shard_size // spec.grid_size) * spec.grid_size
+
+    n_parameters = N * spec.grid_size
+    queue = {'model': model, 'sweep': spec.to_dict(), 'N': N, 'seed': seed, 'engine': engine,
+             'warm_start': warm_start, 'shard_size': shard_size, 'n_parameters': n_parameters,
+             'n_shards': -(-n_parameters // shard_size)}
+
+    path = os.path.join(folder, 'queue.json')
+    if os.path.exists(path):
+        raise ValueError("{0} already holds a queue, remove it to create a new one".format(folder))
+    os.makedirs(os.path.join(folder, 'locks'), exist_ok=True)
+    os.makedirs(os.path.join(folder, 'results'), exist_ok=True)
+    with open(path + '.tmp', 'w') as file:
+        json.dump(queue, file, indent=1)
+    os.replace(path + '.tmp', path)
+    return queue
+
+
+def read_queue(folder):
+    """
+    :param folder: directory of the queue
+    :return: description of the queue (see create_queue)
+    """
+    with open(os.path.join(folder, 'queue.json')) as file:
+        return json.load(file)
+
+
+def claim(folder, worker, lease=None):
+    """
+    Claim the first shard neither solved nor locked by another worker.
+    :param folder: directory of the queue
+    :param worker: name of the worker, written in the lock file
+    :param lease: time (seconds) after which the lock of an unsolved shard is considered abandoned (e.g. by a crashed
+    worker) and the shard claimed again, None to never take a locked shard. It should exceed the time to solve a
+    shard: a shard claimed twice is only solved twice, both workers writing the same results
+    :return: number of the shard claimed, None if no shard is left
+    """
+    queue = read_queue(folder)
+    for shard in range(queue['n_shards']):
+        if os.path.exists(shard_path(folder, 'results', shard)):
+            continue
+        lock = shard_path(folder, 'locks', shard)
+
+        if lease is not None:
+            try:
+                if time.time() - os.path.getmtime(lock) > lease:
+                    # renaming is atomic: a single worker takes over an abandoned lock
+                    os.rename(lock, '{0}.stale-{1}'.format(lock, worker))
+                    os.remove('{0}.stale-{1}'.format(lock, worker))
+            except OSError:
+                pass
+
+        try:
+            descriptor = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            continue
+        with os.fdopen(descriptor, 'w') as file:
+            json.dump({'worker': worker, 'time': time.time()}, file)
+
+        # the shard may have been solved between the check and the lock
+        if os.path.exists(shard_path(folder, 'results', shard)):
+            os.remove(lock)
+            continue
+        return shard
+
+    return None
+
+
+def solve_shard(folder, shard, workers=1):
+    """
+    Solve the simulations of a shard and write them to its result file, atomically.
+    :param folder: directory of the queue
+    :param shard: number of the shard
+    :param workers: number of processes used to run the simulations
+    :return: path of the result file
+    """
+    queue = read_queue(folder)
+    spec = SweepSpec.from_dict(queue['sweep'])
+    first = shard * queue['shard_size']
+    sweep = spec.parameters(queue['N'], queue['seed'])
+    parameters = sweep[first:first + queue['shard_size']]
+
+    grid = sweep.grid_shape if queue['warm_start'] else None
+    sol = solve_parameters(MODELS[queue['model']], parameters, queue['engine'], workers, grid=grid)
+
+    path = shard_path(folder, 'results', shard)
+    temporary = save_dataset(results_dataframe(parameters, sol, start=first),
+                             '{0}.{1}-{2}'.format(os.path.splitext(path)[0], socket.gethostname(), os.getpid()), 'npz')
+    os.replace(temporary, path)
+    return path
+
+
+def work(folder, worker=None, workers=1, lease=None, max_shards=None):
+    """
+    Claim and solve shards until none is left.
+    :param folder: directory of the queue
+    :param worker: name of the worker (by default host:pid)
+    :param workers: number of processes used to run the simulations of a shard
+    :param lease: time (seconds) after which an unsolved locked shard is claimed again (see claim)
+    :param max_shards: maximal number of shards solved, None to go on until the queue is empty
+    :return: list of the shards solved
+    """
+    worker = worker or '{0}:{1}'.format(socket.gethostname(), os.getpid())
+    solved = []
+    while max_shards is None or len(solved) < max_shards:
+        shard = claim(folder, worker, lease)
+        if shard is None:
+            break
+        try:
+            solve_shard(folder, shard, workers)
+        finally:
+            try:
+                os.remove(shard_path(folder, 'locks', shard))
+            except FileNotFoundError:  # lock taken over after the lease
+                pass
+        solved.append(shard)
+        print('{0}: shard {1} solved'.format(worker, shard))
+    return solved
+
+
+def status(folder):
+    """
+    :param folder: directory of the queue
+    :return: dictionary with the numbers of shards 'solved', 'running' (locked) and 'pending'
+    """
+    queue = read_queue(folder)
+    solved = sum(os.path.exists(shard_path(folder, 'results', shard)) for shard in range(queue['n_shards']))
+    running = sum(os.path.exists(shard_path(folder, 'locks', shard)) and not os.path.exists(
+        shard_path(folder, 'results', shard)) for shard in range(queue['n_shards']))
+    return {'solved': solved, 'running': running, 'pending': queue['n_shards'] - solved - running}
+
+
+def merge(folder, label='', fmt='csv'):
+    """
+    Assemble the results of the shards into a dataset, as written by Dataframe_Generator.dataframe_generator.
+    :param folder: directory of the queue
+    :param label: suffix of the file name 'df_{label}'
+    :param fmt: format of the dataset (see Dataset_IO)
+    :return: path of the dataset
+    """
+    queue = read_queue(folder)
+    missing = [shard for shard in range(queue['n_shards']) if not os.path.exists(shard_path(folder, 'results', shard))]
+    if missing:
+        raise ValueError("{0} shards are not solved yet (first: {1})".format(len(missing), missing[0]))
+
+    df = pd.concat([load_dataset(shard_path(folder, 'results', shard)) for shard in range(queue['n_shards'])])
+    if not np.array_equal(df.index.to_numpy(), np.arange(queue['n_parameters'])):
+        raise ValueError("the shards of {0} do not cover the sweep".format(folder))
+
+    metadata = {'model': queue['model'],
+                'sweep': queue['sweep'],
+                'N': queue['N'],
+                'engine': queue['engine'],
+                'seed': queue['seed'],
+                'warm_start': queue['warm_start']}
+    return save_dataset(df, "./df_{0}".format(label), fmt, metadata)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    create_parser = commands.add_parser('create', help='split a sweep into shards')
+    create_parser.add_argument('folder')
+    create_parser.add_argument('--model', default='mimicry', choices=list(MODELS))
+    create_parser.add_argument('--sweep', default='aB', help='name of a sweep of Sweeps.SWEEPS or JSON sweep file')
+    create_parser.add_argument('--N', type=int, default=5, help='number of simulations batches')
+    create_parser.add_argument('--shard-size', type=int, default=1000, help='number of simulations per shard')
+    create_parser.add_argument('--seed', type=int)
+    create_parser.add_argument('--engine', default='solver', choices=list(ENGINES))
+    create_parser.add_argument('--warm-start', action='store_true')
+
+    work_parser = commands.add_parser('work', help='solve shards until none is left')
+    work_parser.add_argument('folder')
+    work_parser.add_argument('--worker', help='name of the worker (default: host:pid)')
+    work_parser.add_argument('--workers', type=int, default=1, help='number of processes per shard')
+    work_parser.add_argument('--lease', type=float, help='seconds after which a locked shard is claimed again')
+    work_parser.add_argument('--max-shards', type=int)
+
+    status_parser = commands.add_parser('status', help='count the solved, running and pending shards')
+    status_parser.add_argument('folder')
+
+    merge_parser = commands.add_parser('merge', help='assemble the shards into a dataset')
+    merge_parser.add_argument('folder')
+    merge_parser.add_argument('--label', default='')
+    merge_parser.add_argument('--fmt', default='csv', choices=['csv', 'parquet', 'feather', 'npz'])
+
+    args = parser.parse_args()
+    if args.command == 'create':
+        print(create_queue(args.folder, args.model, args.sweep, args.N, args.shard_size, args.seed, args.engine,
+                           args.warm_start))
+    elif args.command == 'work':
+        work(args.folder, args.worker, args.workers, args.lease, args.max_shards)
+    elif args.command == 'status':
+        print(status(args.folder))
+    else:
+        print(merge(args.folder, args.label, args.fmt))
@@ -0,0 +1,71 @@
+### libraries
+import pandas as pd
+import pytest
+
+import Dataframe_Generator
+from Dataframe_Generator import dataframe_generator
+from Dataset_IO import load_dataset
+from Functions_Library import no_mimicry
+from Sweeps import default_sweep, SweepSpec
+
+
+def test_interrupted_stream_resumes(tmp_path, monkeypatch):
+    """
+    A streamed run interrupted after its first chunk, called again with the same arguments, resumes after the written
+    chunk and gives the dataset of an uninterrupted run.
+    """
+    monkeypatch.chdir(tmp_path)
+    kwargs = dict(func=no_mimicry, sp2=False, N=1, seed=3, engine='steady')
+    dataframe_generator(label='whole', **kwargs)
+
+    iter_results = Dataframe_Generator.iter_results
+    starts = []
+
+    def interrupted(*args, **kw):
+        starts.append(kw['start'])
+        for df in iter_results(*args, **kw):
+            yield df
+            if len(starts) == 1:
+                raise KeyboardInterrupt
+
+    monkeypatch.setattr(Dataframe_Generator, 'iter_results', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        dataframe_generator(label='streamed', stream=50, **kwargs)
+    assert len(load_dataset('df_streamed.csv')) == 50
+
+    dataframe_generator(label='streamed', stream=50, **kwargs)
+    assert starts == [0, 50]
+    pd.testing.assert_frame_equal(load_dataset('df_streamed.csv'), load_dataset('df_whole.csv'))
+
+
+def test_warm_start_keeps_outcomes_of_bistable_grid(tmp_path, monkeypatch):
+    """
+    On the (a, B) grid of small populations, whose persistence depends on the initial abundance (Allee effect), the
+    sweep solved with warm starts has the outcomes of the sweep solved from the initial conditions.
+    """
+    monkeypatch.chdir(tmp_path)
+    spec = default_sweep(sp2=False).to_dict()
+    spec['random'].update(AB=[1, 100], k1=[1, 5])
+    kwargs = dict(func=no_mimicry, N=4, seed=0, engine='steady', sweep=SweepSpec.from_dict(spec))
+    dataframe_generator(label='cold', **kwargs)
+    dataframe_generator(label='warm', warm_start=True, **kwargs)
+
+    cold, warm = load_dataset('df_cold.csv'), load_dataset('df_warm.csv')
+    # the grid has both outcomes
+    assert 0 < cold['eq_sp1'].sum() < len(cold)
+    pd.testing.assert_series_equal(warm['eq_sp1'], cold['eq_sp1'])
+
+
+def test_ensemble_engine_gives_solver_outcomes(tmp_path, monkeypatch):
+    """
+    The batched 'ensemble' engine, solving chunks of simulations at once, reaches the equilibria of solver.
+    """
+    monkeypatch.chdir(tmp_path)
+    kwargs = dict(func=no_mimicry, sp2=False, N=1, seed=1)
+    dataframe_generator(label='solver', engine='solver', **kwargs)
+    dataframe_generator(label='ensemble', engine='ensemble', chunksize=50, **kwargs)
+
+    solver, ensemble = load_dataset('df_solver.csv'), load_dataset('df_ensemble.csv')
+    pd.testing.assert_frame_equal(ensemble[['eq_sp1', 'eq_sp2', 'coexistence']],
+                                  solver[['eq_sp1', 'eq_sp2', 'coexistence']])
+    pd.testing.assert_frame_equal(ensemble[['F', 'M']], solver[['F', 'M']], rtol=1e-4, atol=1e-6)
@@ -0,0 +1,21 @@
+### libraries
+import os
+
+import pandas as pd
+
+from Dataset_IO import find_dataset, load_dataset, save_dataset
+
+
+def test_regenerated_csv_is_not_hidden_by_stale_binary(tmp_path):
+    """
+    A dataset stored in several formats is read from its most recently modified file.
+    """
+    stale = save_dataset(pd.DataFrame({'a': [0., 1.]}), str(tmp_path / 'df_test'), 'npz')
+    fresh = save_dataset(pd.DataFrame({'a': [2., 3.]}), str(tmp_path / 'df_test'), 'csv')
+    os.utime(stale, (1e9, 1e9))
+
+    assert find_dataset('df_test', str(tmp_path)) == fresh
+    assert load_dataset('df_test', str(tmp_path))['a'].tolist() == [2., 3.]
+
+    os.utime(fresh, (1e9, 1e9))
+    assert find_dataset('df_test', str(tmp_path)) == stale
@@ -0,0 +1,32 @@
+### libraries
+import numpy as np
+import pytest
+
+from Functions_Library import no_mimicry, mimicry, dslm, jacobian, parameter_vector, KERNELS, JACOBIANS, \
+    JACOBIAN_KERNELS, PARAMETER_NAMES
+
+PARAM_DICT = dict(zip(PARAMETER_NAMES[4:], (1, 0.2, 0.3, 0.05, 3, 0.04, 3, 1, 0.3, 1000, 5, 0.8)))
+STATES = [np.array([300, 400, 200, 300], dtype='float64'), np.array([0, 0, 500, 500], dtype='float64'),
+          np.array([800, 100, 5, 20], dtype='float64')]
+
+
+@pytest.mark.parametrize('func', [no_mimicry, mimicry, dslm])
+@pytest.mark.parametrize('n', STATES)
+def test_analytic_jacobian_matches_finite_differences(func, n):
+    """
+    The Jacobian matrices, as dictionary functions and as compiled kernels, are those estimated by central finite
+    differences of the systems.
+    """
+    numerical = jacobian(func, n, PARAM_DICT, analytic=False)
+    assert np.allclose(JACOBIANS[func](n, 0, PARAM_DICT), numerical, rtol=1e-5, atol=1e-8)
+    assert np.allclose(JACOBIAN_KERNELS[func](n, 0, parameter_vector(PARAM_DICT)), numerical, rtol=1e-5, atol=1e-8)
+
+
+@pytest.mark.parametrize('func', [no_mimicry, mimicry, dslm])
+@pytest.mark.parametrize('n', STATES + [np.random.default_rng(0).uniform(0, 1000, 4), np.zeros(4)])
+def test_kernel_matches_system(func, n):
+    """
+    The compiled kernels compute the differential equations systems, including for absent species.
+    """
+    assert np.allclose(KERNELS[func](n, 0, parameter_vector(PARAM_DICT)), func(n, 0, PARAM_DICT), rtol=1e-12,
+                       atol=1e-12)
@@ -0,0 +1,21 @@
+### libraries
+import numpy as np
+import pytest
+
+from Functions_Library import no_mimicry
+from Stochastic import simulate, extinction_summary
+
+
+@pytest.mark.parametrize('AB, SR', [(1, 0.6), (2, 0.75)])
+def test_species_without_female_goes_extinct_at_start(AB, SR):
+    """
+    A species whose females round to 0 (0.4 and 0.5 females) is present and goes extinct at t = 0, not absent.
+    """
+    params = (AB, SR, 0, 0, 0.85, 0.2, 0.3, 0.02, 3, 0, 1, 1, 0, 1000, 5, 0.8)
+    final, times = simulate(no_mimicry, [params], replicates=20, t_max=10, seed=0)
+    summary = extinction_summary(times).iloc[0]
+
+    assert summary['p_ext_sp1'] == 1
+    assert summary['t_ext_sp1_mean'] == 0
+    assert np.isnan(summary['p_ext_sp2'])
+    assert (final[0] == 0).all()
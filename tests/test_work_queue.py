@@ -0,0 +1,29 @@
+### libraries
+import multiprocessing as mp
+
+import pandas as pd
+
+import Work_Queue
+from Dataframe_Generator import dataframe_generator
+from Dataset_IO import load_dataset
+from Functions_Library import no_mimicry
+
+
+def test_workers_merge_into_direct_dataset(tmp_path, monkeypatch):
+    """
+    Three workers sharing a queue in a temporary directory solve each shard once, and the merged dataset is the one
+    generated directly by dataframe_generator.
+    """
+    monkeypatch.chdir(tmp_path)
+    folder = str(tmp_path / 'queue')
+    Work_Queue.create_queue(folder, model='no_mimicry', sweep='aB', N=2, shard_size=50, seed=4, engine='steady')
+
+    with mp.Pool(3) as pool:
+        solved = pool.starmap(Work_Queue.work, [(folder, 'worker-{0}'.format(i)) for i in range(3)])
+    shards = sorted(shard for worker in solved for shard in worker)
+    assert shards == list(range(Work_Queue.read_queue(folder)['n_shards']))
+    assert Work_Queue.status(folder) == {'solved': len(shards), 'running': 0, 'pending': 0}
+
+    Work_Queue.merge(folder, label='merged')
+    dataframe_generator(func=no_mimicry, sweep='aB', N=2, seed=4, engine='steady', label='direct')
+    pd.testing.assert_frame_equal(load_dataset('df_merged.csv'), load_dataset('df_direct.csv'))